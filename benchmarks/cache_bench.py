@@ -0,0 +1,35 @@
+import os
+import time
+import tempfile
+
+from cache import ParseCache
+from file import File
+from sidecar import write_sidecar, sidecar_filename
+
+NUM_POINTS = 200000
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'IN_LARGE.csv')
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write('Model Type: PSA2702,\nStart Frequency: 0470.0000 MHz,\n')
+            file.writelines(f'{470 + i * 0.002:09.4f},-{90 + i % 17:05.1f}\n' for i in range(NUM_POINTS))
+        cache = ParseCache(os.path.join(directory, 'cache'))
+
+        start = time.perf_counter()
+        parsed = File(filename, 'United Kingdom', cache=cache)
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        File(filename, 'United Kingdom', cache=cache)
+        hit_time = time.perf_counter() - start
+
+        print(f'{NUM_POINTS} points')
+        print(f'Cold parse: {cold_time * 1000:.2f}ms')
+        print(f'Cache hit:  {hit_time * 1000:.2f}ms ({cold_time / hit_time:.1f}x)')
+
+        write_sidecar(sidecar_filename(filename), parsed.freqs_hz, parsed.levels_fixed, {'model': parsed.model})
+        start = time.perf_counter()
+        File(filename, 'United Kingdom')
+        sidecar_time = time.perf_counter() - start
+        print(f'Sidecar:    {sidecar_time * 1000:.2f}ms ({cold_time / sidecar_time:.1f}x)')
@@ -0,0 +1,50 @@
+import time
+import datetime
+
+import numpy
+
+from chart import ChartRenderer, file_data
+from merge import span_indexes
+from units import to_hz, to_fixed
+from waterfall import Waterfall
+
+# In-memory source with the File interface used by ChartRenderer and Waterfall
+class ArraySource:
+    def __init__(self, freqs, levels, creation_date):
+        self.freqs_hz = to_hz(freqs)
+        self.levels_fixed = to_fixed(levels)
+        self.start_frequency = freqs[0]
+        self.stop_frequency = freqs[-1]
+        self.resolution = freqs[1] - freqs[0]
+        self.creation_date = creation_date
+
+    def slice_hz(self, span):
+        start, stop = span_indexes(self.freqs_hz, span)
+        return self.freqs_hz[start:stop], self.levels_fixed[start:stop]
+
+def main():
+    rng = numpy.random.default_rng(0)
+    freqs = 470 + numpy.arange(20000) * 0.02
+    sources = [ArraySource(freqs, rng.uniform(-110, -60, len(freqs)).round(1),
+                           datetime.datetime(2023, 1, 1) + datetime.timedelta(hours=i)) for i in range(500)]
+
+    # Waterfall grid built incrementally as scans are added
+    waterfall = Waterfall()
+    start_time = time.perf_counter()
+    for source in sources:
+        waterfall.add(source)
+        grid = waterfall.grid
+    assert grid.shape == (len(sources), waterfall.columns)
+    print(f'Waterfall grid updated after each of {len(sources)} scans: {time.perf_counter() - start_time:.3f}s')
+
+    renderer = ChartRenderer()
+    for title, request in [
+            ('Waterfall', ('waterfall', waterfall.grid, waterfall.span, 'United Kingdom')),
+            ('Overlay', ('overlay', [(source, file_data(source)) for source in sources], None, 'United Kingdom'))]:
+        for attempt in ['first', 'cached']:
+            start_time = time.perf_counter()
+            renderer.render(request)
+            print(f'{title} of {len(sources)} scans ({attempt}): {time.perf_counter() - start_time:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import re
+import time
+import random
+
+import numpy
+
+from file import parse_csv
+
+NUM_LINES = 1000000
+
+# Function to build a synthetic TTi style scan
+def synthetic_scan(num_lines):
+    lines = ['Model Type: PSA2702,', 'Start Frequency: 0470.0000 MHz,', 'Stop Frequency: 0870.0000 MHz,']
+    for i in range(num_lines):
+        lines.append(f'{470 + i * 0.0004:09.4f},{random.uniform(-110, -30):06.1f}')
+    return '\n'.join(lines) + '\n'
+
+# Previous per-line parser for comparison
+def parse_per_line(text):
+    freqs = []
+    levels = []
+    for line in text.splitlines(True):
+        split_line = re.split('[\t,;]', line)
+        try:
+            freq = float(split_line[0].strip())
+            value = float(split_line[1].strip())
+            freqs.append(freq)
+            levels.append(value)
+        except ValueError:
+            pass
+    return freqs, levels
+
+if __name__ == '__main__':
+    SCAN = synthetic_scan(NUM_LINES)
+    buffer = numpy.frombuffer(SCAN.encode('ascii'), dtype=numpy.uint8)
+
+    start = time.perf_counter()
+    old_freqs, old_levels = parse_per_line(SCAN)
+    per_line_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_freqs, new_levels = parse_csv(buffer)
+    bulk_time = time.perf_counter() - start
+
+    assert old_freqs == new_freqs.tolist() and old_levels == new_levels.tolist()
+    print(f'{NUM_LINES} lines')
+    print(f'Per-line parser: {per_line_time:.3f}s')
+    print(f'Bulk parser:     {bulk_time:.3f}s ({per_line_time / bulk_time:.1f}x)')
@@ -0,0 +1,27 @@
+import time
+
+import numpy
+
+from decimate import decimate, envelope
+
+def main():
+    rng = numpy.random.default_rng(0)
+    for num_points in [1000000, 10000000]:
+        freqs = 470 + numpy.arange(num_points) * 0.0001
+        levels = rng.uniform(-110, -30, num_points).round(1)
+        for max_points, bucket_width in [(10000, 0), (0, 0.025), (10000, 0.025)]:
+            start_time = time.perf_counter()
+            decimated_freqs, decimated_levels = decimate(freqs, levels, max_points, bucket_width)
+            decimate_time = time.perf_counter() - start_time
+            assert decimated_levels.max() == levels.max() and decimated_levels.min() == levels.min()
+            print(f'{num_points} points, max {max_points} points, {bucket_width * 1000:g}kHz step '
+                  f'-> {len(decimated_freqs)}: {decimate_time:.3f}s')
+
+        # Chart envelope for a 320 pixel wide plot
+        start_time = time.perf_counter()
+        envelope_freqs, _ = envelope(freqs, levels, 320 * 4)
+        envelope_time = time.perf_counter() - start_time
+        print(f'{num_points} points, chart envelope -> {len(envelope_freqs)}: {envelope_time:.3f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import os
+import tempfile
+import tracemalloc
+
+import numpy
+
+from file import File
+
+NUM_POINTS = 500000
+
+# Function to measure memory allocated while building a representation
+def measure(build):
+    tracemalloc.start()
+    representation = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del representation
+    return size
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'IN_LARGE.csv')
+        with open(filename, 'w', encoding='utf-8') as file:
+            file.write('Model Type: PSA2702,\nStart Frequency: 0470.0000 MHz,\n')
+            file.writelines(f'{470 + i * 0.0005:09.4f},-{90 + i % 170 / 10:05.2f}\n' for i in range(NUM_POINTS))
+        fixed = File(filename, 'United Kingdom')
+        compact = File(filename, 'United Kingdom', compact=True)
+        assert compact.get_output_file() == fixed.get_output_file()
+
+        for name, build in [
+                ('list', lambda: [list(point) for point in fixed.frequencies]),
+                ('float64', lambda: (numpy.array(fixed.freqs), numpy.array(fixed.levels))),
+                ('int64/int32', lambda: File(filename, 'United Kingdom')),
+                ('compact', lambda: File(filename, 'United Kingdom', compact=True))]:
+            size = measure(build)
+            print(f'{name:12} {size / 1024 / 1024:7.2f}MB {size / NUM_POINTS:6.1f} bytes/point')
+
+if __name__ == '__main__':
+    main()
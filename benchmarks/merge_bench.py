@@ -0,0 +1,59 @@
+import time
+
+import numpy
+
+from merge import merge_runs, span_indexes, MasterSpectrum
+from units import to_hz, to_fixed
+
+# In-memory source with the File interface used by MasterSpectrum
+class ArraySource:
+    def __init__(self, freqs, levels):
+        self.freqs_hz = to_hz(freqs)
+        self.levels_fixed = to_fixed(levels)
+        self.start_frequency = freqs[0]
+        self.stop_frequency = freqs[-1]
+
+    def slice_hz(self, span):
+        start, stop = span_indexes(self.freqs_hz, span)
+        return self.freqs_hz[start:stop], self.levels_fixed[start:stop]
+
+# Function to build overlapping sorted scans totalling num_points
+def synthetic_runs(num_points, num_files=50):
+    rng = numpy.random.default_rng(0)
+    points_per_file = num_points // num_files
+    runs = []
+    for i in range(num_files):
+        start = 470 + (i % 10) * 5
+        freqs = start + numpy.arange(points_per_file) * (0.025 if i % 2 else 0.0125)
+        runs.append((freqs, rng.uniform(-110, -30, points_per_file).round(1)))
+    return runs
+
+def main():
+    for total_points in [1000000, 10000000]:
+        runs = synthetic_runs(total_points)
+        start_time = time.perf_counter()
+        merged_freqs, _ = merge_runs(runs)
+        merge_time = time.perf_counter() - start_time
+        assert numpy.all(merged_freqs[1:] > merged_freqs[:-1])
+        print(f'{total_points} points -> {len(merged_freqs)} unique: {merge_time:.3f}s')
+
+    # Remove one of 300 files spread across the spectrum from an incremental master
+    sources = []
+    for i in range(300):
+        freqs = 470 + i * 5 + numpy.arange(20000) * 0.0005
+        sources.append(ArraySource(freqs, numpy.full(len(freqs), -80.0)))
+    for limits in [(0, 0), (600, 610)]:
+        master = MasterSpectrum(limits)
+        for source in sources:
+            master.add(source)
+        start_time = time.perf_counter()
+        total_points = len(master)
+        merge_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        master.remove(sources[150])
+        remove_time = time.perf_counter() - start_time
+        print(f'limits {limits}: master of {total_points} points, '
+              f'full merge {merge_time:.4f}s, remove one file {remove_time:.4f}s')
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
+import multiprocessing
 from gui import GUI
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     gui = GUI()
     gui.start()
@@ -0,0 +1,110 @@
+import os
+import hashlib
+import zipfile
+import numpy
+import data
+from units import LEVEL_SCALE
+
+DEFAULT_DIRECTORY = os.path.join(data.PLIST_PATH, 'cache')
+DEFAULT_SIZE_LIMIT = 256 * 1024 * 1024
+EXTENSION = '.npz'
+
+class ParseCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY, size_limit=DEFAULT_SIZE_LIMIT):
+        self.directory = directory
+        self.size_limit = size_limit
+        self._size = None
+
+    # Method to get cache entry filename from source path, size, modification time and level scale
+    def _entry(self, filename):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        key = f'{os.path.abspath(filename)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{LEVEL_SCALE}'
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + EXTENSION)
+
+    # Method to return cached arrays and details, or None if file not cached
+    def get(self, filename):
+        entry = self._entry(filename)
+        if entry is None or not os.path.isfile(entry):
+            return None
+        try:
+            with numpy.load(entry) as cached:
+                result = {
+                    'freqs_hz': cached['freqs_hz'],
+                    'levels_fixed': cached['levels_fixed'],
+                    'model': str(cached['model']),
+                    'creation_date': float(cached['creation_date'])
+                }
+            # Mark entry as recently used
+            os.utime(entry)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        return result
+
+    # Method to store parsed integer arrays and details (model and creation_date timestamp)
+    def put(self, filename, freqs_hz, levels_fixed, details):
+        entry = self._entry(filename)
+        if entry is None:
+            return
+        temp_entry = f'{entry}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_entry, 'wb') as file:
+                numpy.savez(
+                    file,
+                    freqs_hz=freqs_hz,
+                    levels_fixed=levels_fixed,
+                    model=numpy.array(details['model']),
+                    creation_date=numpy.array(details['creation_date']))
+            os.replace(temp_entry, entry)
+        except OSError:
+            return
+
+        if self._size is None:
+            self._size = self._total_size()
+        else:
+            self._size += os.path.getsize(entry)
+        if self._size > self.size_limit:
+            self._evict(entry)
+
+    # Method to get cache entries ordered from least to most recently used
+    def _entries(self):
+        entries = []
+        try:
+            with os.scandir(self.directory) as directory:
+                for entry in directory:
+                    if entry.name.endswith(EXTENSION):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            pass
+        return sorted(entries)
+
+    def _total_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    # Method to remove least recently used entries until cache is within size limit
+    def _evict(self, keep=None):
+        entries = self._entries()
+        self._size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self._size <= self.size_limit:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                self._size -= size
+            except OSError:
+                pass
+
+    # Method to remove all cache entries
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._size = 0
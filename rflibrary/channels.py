@@ -0,0 +1,221 @@
+import bisect
+import numpy
+
+# Sorted channel bounds for binary searching a country's TV channel list
+class ChannelIndex:
+    def __init__(self, channels):
+        channels = sorted(channels, key=lambda channel: float(channel[1]))
+        self.numbers = [channel[0] for channel in channels]
+        self.lows = numpy.array([float(channel[1]) for channel in channels])
+        self.highs = numpy.array([float(channel[2]) for channel in channels])
+        self._low_list = self.lows.tolist()
+        self._high_list = self.highs.tolist()
+
+    # Method to get index of channel containing frequency (low <= freq < high), or -1
+    def _start_index(self, freq):
+        index = bisect.bisect_right(self._low_list, freq) - 1
+        return index if index >= 0 and freq < self._high_list[index] else -1
+
+    # Method to get index of channel containing frequency (low < freq <= high), or -1
+    def _stop_index(self, freq):
+        index = bisect.bisect_left(self._high_list, freq)
+        return index if index < len(self._high_list) and freq > self._low_list[index] else -1
+
+    # Method to get channel number containing frequency, or None
+    def channel(self, freq):
+        index = self._start_index(freq)
+        return None if index == -1 else self.numbers[index]
+
+    # Method to get start and stop channel numbers of a frequency range
+    def span(self, start, stop):
+        start_index = self._start_index(start)
+        if start_index == -1:
+            return None, None
+        stop_index = self._stop_index(stop)
+        if stop_index < start_index:
+            return self.numbers[start_index], None
+        return self.numbers[start_index], self.numbers[stop_index]
+
+    # Method to get start and stop channel numbers of many frequency ranges at once
+    def spans(self, starts, stops):
+        starts = numpy.asarray(starts, dtype=float)
+        stops = numpy.asarray(stops, dtype=float)
+        start_indexes = numpy.searchsorted(self.lows, starts, 'right') - 1
+        start_found = (start_indexes >= 0) & (starts < self.highs[start_indexes])
+        stop_indexes = numpy.searchsorted(self.highs, stops, 'left')
+        stop_found = stop_indexes < len(self.highs)
+        stop_found[stop_found] &= stops[stop_found] > self.lows[stop_indexes[stop_found]]
+        stop_found &= start_found & (stop_indexes >= start_indexes)
+
+        spans = []
+        for start_index, start_ok, stop_index, stop_ok in zip(
+                start_indexes.tolist(), start_found.tolist(), stop_indexes.tolist(), stop_found.tolist()):
+            spans.append((
+                self.numbers[start_index] if start_ok else None,
+                self.numbers[stop_index] if stop_ok else None))
+        return spans
+
+    # Method to get channels whose lower bound lies within a frequency range
+    def channels_between(self, low, high):
+        first = bisect.bisect_left(self._low_list, low)
+        last = bisect.bisect_right(self._low_list, high)
+        return list(zip(self.numbers[first:last], self._low_list[first:last], self._high_list[first:last]))
+
+# Function to get the channel index for a country
+def channel_index(country):
+    return CHANNEL_INDEXES['United States of America' if country == 'United States of America' else 'UK']
+
+TV_CHANNELS = {
+    'UK': [
+        [1, 43.25, 50],
+        [2, 50, 55],
+        [3, 55, 60],
+        [4, 60, 65],
+        [5, 65, 70],
+        [6, 178, 183],
+        [7, 183, 188],
+        [8, 188, 193],
+        [9, 193, 198],
+        [10, 198, 203],
+        [11, 203, 208],
+        [12, 208, 213],
+        [13, 213, 218],
+        [21, 470, 478],
+        [22, 478, 486],
+        [23, 486, 494],
+        [24, 494, 502],
+        [25, 502, 510],
+        [26, 510, 518],
+        [27, 518, 526],
+        [28, 526, 534],
+        [29, 534, 542],
+        [30, 542, 550],
+        [31, 550, 558],
+        [32, 558, 566],
+        [33, 566, 574],
+        [34, 574, 582],
+        [35, 582, 590],
+        [36, 590, 598],
+        [37, 598, 606],
+        [38, 606, 614],
+        [39, 614, 622],
+        [40, 622, 630],
+        [41, 630, 638],
+        [42, 638, 646],
+        [43, 646, 654],
+        [44, 654, 662],
+        [45, 662, 670],
+        [46, 670, 678],
+        [47, 678, 686],
+        [48, 686, 694],
+        [49, 694, 702],
+        [50, 702, 710],
+        [51, 710, 718],
+        [52, 718, 726],
+        [53, 726, 734],
+        [54, 734, 742],
+        [55, 742, 750],
+        [56, 750, 758],
+        [57, 758, 766],
+        [58, 766, 774],
+        [59, 774, 782],
+        [60, 782, 790],
+        [61, 790, 798],
+        [62, 798, 806],
+        [63, 806, 814],
+        [64, 814, 822],
+        [65, 822, 830],
+        [66, 830, 838],
+        [67, 838, 846],
+        [68, 846, 854],
+        [69, 854, 862],
+        [70, 862, 870],
+        [71, 870, 878]
+    ],
+    'United States of America': [
+        [2, 54, 60],
+        [3, 60, 66],
+        [4, 66, 72],
+        [5, 76, 82],
+        [6, 82, 88],
+        [7, 174, 180],
+        [8, 180, 186],
+        [9, 186, 192],
+        [10, 192, 198],
+        [11, 198, 204],
+        [12, 204, 210],
+        [13, 210, 216],
+        [14, 470, 476],
+        [15, 476, 482],
+        [16, 482, 488],
+        [17, 488, 494],
+        [18, 494, 500],
+        [19, 500, 506],
+        [20, 506, 512],
+        [21, 512, 518],
+        [22, 518, 524],
+        [23, 524, 530],
+        [24, 530, 536],
+        [25, 536, 542],
+        [26, 542, 548],
+        [27, 548, 554],
+        [28, 554, 560],
+        [29, 560, 566],
+        [30, 566, 572],
+        [31, 572, 578],
+        [32, 578, 584],
+        [33, 584, 590],
+        [34, 590, 596],
+        [35, 596, 602],
+        [36, 602, 608],
+        [37, 608, 614],
+        [38, 614, 620],
+        [39, 620, 626],
+        [40, 626, 632],
+        [41, 632, 638],
+        [42, 638, 644],
+        [43, 644, 650],
+        [44, 650, 656],
+        [45, 656, 662],
+        [46, 662, 668],
+        [47, 668, 674],
+        [48, 674, 680],
+        [49, 680, 686],
+        [50, 686, 692],
+        [51, 692, 698],
+        [52, 698, 704],
+        [53, 704, 710],
+        [54, 710, 716],
+        [55, 716, 722],
+        [56, 722, 728],
+        [57, 728, 734],
+        [58, 734, 740],
+        [59, 740, 746],
+        [60, 746, 752],
+        [61, 752, 758],
+        [62, 758, 764],
+        [63, 764, 770],
+        [64, 770, 776],
+        [65, 776, 782],
+        [66, 782, 788],
+        [67, 788, 794],
+        [68, 794, 800],
+        [69, 800, 806],
+        [70, 806, 812],
+        [71, 812, 818],
+        [72, 818, 824],
+        [73, 824, 830],
+        [74, 830, 836],
+        [75, 836, 842],
+        [76, 842, 848],
+        [77, 848, 854],
+        [78, 854, 860],
+        [79, 860, 866],
+        [80, 866, 872],
+        [81, 872, 878],
+        [82, 878, 884],
+        [83, 884, 890]
+    ]
+}
+
+CHANNEL_INDEXES = {country: ChannelIndex(channels) for country, channels in TV_CHANNELS.items()}
@@ -1,80 +1,283 @@
 import tkinter as tk
+import threading
+import traceback
+import weakref
+import numpy
 import matplotlib
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import matplotlib.figure
+import matplotlib.ticker
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from PIL import Image, ImageTk
 
-from file import TV_CHANNELS
+from channels import channel_index
+from decimate import envelope
+from units import from_hz, from_fixed
 
+# Envelope columns per horizontal pixel, several so antialiased edges match the full plot
+COLUMNS_PER_PIXEL = 4
+
+# Levels (dBm) at or below this are left out of the y axis range
+LEVEL_FLOOR = -120
+
+# Chart views selectable in the GUI
+chart_views = ['Scan', 'Overlay', 'Waterfall']
+
+# Milliseconds between checks for a finished frame while rendering
+POLL_INTERVAL = 15
+
+# Chart shown in Tk, rendered by a background thread with only the latest request kept
 class Chart:
     def __init__(self, frame):
-        self.x_values = []
-        self.y_values = []
+        self._frame = frame
+        self._renderer = ChartRenderer()
+        self._condition = threading.Condition()
+        self._request = None
+        self._request_id = 0
+        self._rendered = None
+        self._polling = False
+
+        # Show empty chart before starting the render thread
+        self._image = None
+        self.label = tk.Label(frame, borderwidth=0, highlightthickness=0)
+        self.label.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self._show(self._renderer.render(None))
+        threading.Thread(target=self._render_loop, daemon=True).start()
+
+    # Method to request file is drawn, taking its arrays now so the render thread never touches the file
+    def update(self, file, country):
+        self._submit(('scan', file, file_data(file), country))
+
+    # Method to request all files are drawn on one axis, with the master (or None) on top
+    def update_overlay(self, files, master, country):
+        self._submit(('overlay', [(file, file_data(file)) for file in files],
+                      None if master is None else (master, file_data(master)), country))
+
+    # Method to request a waterfall of scans over time is drawn
+    def update_waterfall(self, waterfall, country):
+        self._submit(('waterfall', waterfall.grid, waterfall.span, country))
+
+    def clear(self):
+        self._submit(None)
+
+    # Method to replace any waiting request, so stale selections are never rendered
+    def _submit(self, request):
+        with self._condition:
+            self._request_id += 1
+            self._request = (self._request_id, request)
+            self._condition.notify()
+        if not self._polling:
+            self._polling = True
+            self._frame.after(POLL_INTERVAL, self._poll)
+
+    def _render_loop(self):
+        while True:
+            with self._condition:
+                while self._request is None:
+                    self._condition.wait()
+                request_id, request = self._request
+                self._request = None
+            try:
+                rendered = self._renderer.render(request)
+            # Show an empty chart rather than stop rendering if a request can't be drawn
+            except Exception:  # pylint: disable=broad-exception-caught
+                traceback.print_exc()
+                rendered = self._renderer.render(None)
+            with self._condition:
+                self._rendered = (request_id, rendered)
+
+    # Method to show the latest frame on the Tk thread, polling until it has been rendered
+    def _poll(self):
+        with self._condition:
+            rendered = self._rendered
+            latest = self._request_id
+            self._rendered = None
+        if rendered is not None and rendered[0] == latest:
+            self._show(rendered[1])
+            self._polling = False
+            return
+        self._frame.after(POLL_INTERVAL, self._poll)
+
+    def _show(self, rendered):
+        size, rgba = rendered
+        self._image = ImageTk.PhotoImage(Image.frombuffer('RGBA', size, rgba, 'raw', 'RGBA', 0, 1))
+        self.label.configure(image=self._image)
+
+# Offscreen chart, only used from one thread at a time
+class ChartRenderer:
+    def __init__(self):
+        self.x_values = numpy.empty(0)
+        self.y_values = numpy.empty(0)
+        self._plot_cache = weakref.WeakKeyDictionary()
+
+        # Set Font
+        matplotlib.rcParams.update({ 'font.size': 9 })
 
         self.fig = matplotlib.figure.Figure(figsize=(3.2, 2.65), dpi=100, facecolor='white')
         self.axis = self.fig.add_subplot(111)
         self.axis.set_position([0.15, 0.1, 0.81, 0.81])
-        self.canvas = FigureCanvasTkAgg(self.fig, frame)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas = FigureCanvasAgg(self.fig)
+
+        # Persistent artists, with the scan fill and line drawn over a cached background of the axes
+        self._fill = self.axis.fill_between([], [], facecolor='lightGreen', animated=True)
+        self._line, = self.axis.plot([], [], color='green', animated=True)
+        self._overlay = None
+        self._waterfall = None
+        self._background = None
+        self._background_key = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         self.clear()
 
-    def update(self, file, country):
-        # Get x,y values
-        previous = None
-        self.x_values.clear()
-        self.y_values.clear()
-
-        for point in file.frequencies:
-            if previous is None:
-                previous = [point[0], point[1]]
-            if previous[0] + (file.resolution * 2) < point[0]:
-                self.x_values.append(previous[0] + file.resolution)
-                self.y_values.append(-200)
-                self.x_values.append(point[0] - file.resolution)
-                self.y_values.append(-200)
-            self.x_values.append(point[0])
-            self.y_values.append(point[1])
-            previous = point
+    # Method to render a request from Chart, or None to clear, returning size and RGBA bytes
+    def render(self, request):
+        if request is None:
+            self.clear()
+        else:
+            {
+                'scan': self.update,
+                'overlay': self.update_overlay,
+                'waterfall': self.update_waterfall
+            }[request[0]](*request[1:])
+        return self.canvas.get_width_height(), bytes(self.canvas.buffer_rgba())
+
+    # Method to draw file data, a tuple from file_data
+    def update(self, file, data, country):
+        # Get x,y values reduced to the axis width
+        axeswidth = self._axes_size()[0]
+        self.x_values, self.y_values, ymin, ymax = self._plot_data(file, data, max(int(axeswidth), 1))
 
         # Get axis values
-        ymin = min(i for i in self.y_values if i > -120)
-        ymax = max(self.y_values)
-        ymin = int((ymin - 5) / 5) * 5 if ymin > -95 or ymin < -105 else -105
-        ymax = int((ymax + 5) / 5) * 5 if ymax > ymin + 45 else ymin + 45
+        ymin, ymax = level_limits(ymin, ymax)
 
         # Get x tick values
-        min_pixel_distance = 25
-        axeswidth = self.axis.get_window_extent().transformed(self.fig.dpi_scale_trans.inverted()).width * self.fig.dpi
-        min_tick_distance = ((self.x_values[-1] - self.x_values[0]) * min_pixel_distance) / axeswidth
-        x_ticks = []
-        prev = 0
-        tv_country = country if country == 'United States of America' else 'UK'
-        for channel in TV_CHANNELS[tv_country]:
-            if channel[1] - prev >= min_tick_distance \
-                and file.frequencies[0][0] <= channel[1] \
-                and file.frequencies[-1][0] >= channel[1]:
-                x_ticks.append(channel[1])
-                prev = channel[1]
-
-        # Clear previous graph
-        self.axis.clear()
+        x_ticks = channel_ticks(country, self.x_values[0], self.x_values[-1], axeswidth)
 
-        # Set Style
-        self.axis.get_yaxis().set_visible(True)
-        self.axis.get_xaxis().set_visible(True)
+        # Update graph data
+        baseline = int(ymin) - 1
+        self._fill.set_verts([numpy.column_stack((
+            numpy.concatenate(([self.x_values[0]], self.x_values, [self.x_values[-1]])),
+            numpy.concatenate(([baseline], self.y_values, [baseline]))))])
+        self._line.set_data(self.x_values, self.y_values)
+        self._show_artists(self._fill, self._line)
+
+        # Only redraw axes if limits or ticks have changed, else draw graph over cached background
+        key = (self.x_values[0], self.x_values[-1], ymin, ymax, tuple(x_ticks))
+        if key == self._background_key and self._background is not None:
+            self._restore()
+            return
+        self._set_axes([self.x_values[0], self.x_values[-1], ymin, ymax], x_ticks)
+        self._background_key = key
+
+    # Method to draw a list of (file, data) as an image of how many scans pass through each pixel,
+    # with master (file, data) or None on top as a line
+    def update_overlay(self, sources, master, country):
+        axeswidth, axesheight = self._axes_size()
+        plots = [self._plot_data(file, data, max(int(axeswidth), 1)) for file, data in sources]
+        if master is not None:
+            master_plot = self._plot_data(*master, max(int(axeswidth), 1))
+            self._line.set_data(*master_plot[:2])
+            plots.append(master_plot)
+
+        low = min(plot[0][0] for plot in plots)
+        high = max(plot[0][-1] for plot in plots)
+        ymin, ymax = level_limits(min(plot[2] for plot in plots), max(plot[3] for plot in plots))
+        counts = hit_counts(
+            [plot[:2] for plot in plots[:len(sources)]],
+            (low, high, ymin, ymax),
+            (max(int(axeswidth), 1), max(int(axesheight), 1)))
+        if self._overlay is None:
+            self._overlay = self.axis.imshow(
+                counts.T, origin='lower', aspect='auto', interpolation='nearest', cmap='Greens')
+        self._overlay.set_data(numpy.ma.masked_equal(counts.T, 0))
+        self._overlay.set_extent((low, high, ymin, ymax))
+        self._overlay.set_clim(0, max(counts.max(), 1))
+        self._show_artists(self._overlay, self._line if master is not None else None)
+        self._set_axes([low, high, ymin, ymax], channel_ticks(country, low, high, axeswidth))
+
+    # Method to draw a grid of levels with a row per scan from oldest at the top, over a span (MHz)
+    def update_waterfall(self, grid, span, country):
+        if self._waterfall is None:
+            self._waterfall = self.axis.imshow(grid, aspect='auto', interpolation='nearest', cmap='viridis')
+        finite = grid[numpy.isfinite(grid)]
+        self._waterfall.set_data(grid)
+        self._waterfall.set_extent((span[0], span[1], len(grid), 0))
+        self._waterfall.set_clim(*((finite.min(), finite.max()) if len(finite) > 0 else (-120, -20)))
+        self._show_artists(self._waterfall)
+        self._set_axes(
+            [span[0], span[1], len(grid), 0],
+            channel_ticks(country, span[0], span[1], self._axes_size()[0]),
+            'Scans')
+
+    # Method to get axes (width, height) in pixels
+    def _axes_size(self):
+        extent = self.axis.get_window_extent().transformed(self.fig.dpi_scale_trans.inverted())
+        return extent.width * self.fig.dpi, extent.height * self.fig.dpi
+
+    # Method to show only the given artists
+    def _show_artists(self, *artists):
+        for artist in [self._fill, self._line, self._overlay, self._waterfall]:
+            if artist is not None:
+                artist.set_visible(artist in artists)
+
+    # Method to set axes style, [xmin, xmax, ymin, ymax] limits and ticks, with levels on the y axis
+    # unless a y label is given, then fully redraw
+    def _set_axes(self, limits, x_ticks, ylabel=''):
+        self._background_key = None
+
+        # Set Style, restoring the axes defaults changed by clear
+        self.axis.set_facecolor(matplotlib.rcParams['axes.facecolor'])
+        self.axis.set_axisbelow(matplotlib.rcParams['axes.axisbelow'])
         self.axis.grid(linestyle='-', color='grey')
-        self.axis.fill_between(self.x_values, int(ymin) - 1, self.y_values, facecolor='lightGreen')
+        self.axis.set_xlabel('')
+        self.axis.set_ylabel(ylabel)
 
         # Set axis/ticks
-        self.axis.axis([self.x_values[0], self.x_values[-1], ymin, ymax])
+        self.axis.axis(limits)
         self.axis.set_xticks(x_ticks, minor=False)
+        if ylabel == '':
+            self.axis.yaxis.set_major_locator(matplotlib.ticker.AutoLocator())
+        else:
+            self.axis.set_yticks([])
 
         # Draw Graph
-        self.axis.plot(self.x_values, self.y_values, color='green')
         self.canvas.draw()
 
+    # Method to cache background and draw graph after each full draw
+    def _on_draw(self, _):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_artists()
+
+    # Method to draw animated artists with axes frame over the fill, as when drawn with the axes
+    def _draw_artists(self):
+        if self._fill.get_visible():
+            self.axis.draw_artist(self._fill)
+            for spine in self.axis.spines.values():
+                self.axis.draw_artist(spine)
+        if self._line.get_visible():
+            self.axis.draw_artist(self._line)
+
+    def _restore(self):
+        self.canvas.restore_region(self._background)
+        self._draw_artists()
+
+    # Method to get plot arrays of file data reduced to width pixels with level range,
+    # cached for each file until its data version changes
+    def _plot_data(self, file, data, width):
+        version, freqs_hz, levels_fixed, resolution = data
+        cached = self._plot_cache.get(file)
+        if cached is None or cached[0] != version:
+            levels = from_fixed(levels_fixed)
+            above_floor = levels[levels > LEVEL_FLOOR]
+            cached = (version, {}, above_floor.min() if len(above_floor) > 0 else LEVEL_FLOOR, levels.max())
+            self._plot_cache[file] = cached
+        if width not in cached[1]:
+            cached[1][width] = envelope(
+                *plot_arrays(from_hz(freqs_hz), from_fixed(levels_fixed), resolution), width * COLUMNS_PER_PIXEL)
+        return (*cached[1][width], cached[2], cached[3])
+
     def clear(self):
-        # Clear Graph
-        self.axis.clear()
+        # Hide Graph
+        self._show_artists()
+        self._background_key = None
 
         # Set Style
         self.axis.set_facecolor('lightGrey')
@@ -85,8 +288,57 @@ class Chart:
         self.axis.set_xlabel('Frequency /MHz')
         self.axis.set_ylabel('Level /dBm')
 
-        # Set Font
-        matplotlib.rcParams.update({ 'font.size': 9 })
-
         # Draw Canvas
         self.canvas.draw()
+
+# Function to get the data drawn for a file (or master) as a tuple of data version, freqs_hz, levels_fixed
+# and resolution, where sources without a version never change their data
+def file_data(file):
+    freqs_hz, levels_fixed = file.freqs_hz, file.levels_fixed
+    return getattr(file, 'version', 0), freqs_hz, levels_fixed, file.resolution
+
+# Function to get y axis limits rounded out to 5dB for levels from ymin to ymax, at least 45dB apart
+def level_limits(ymin, ymax):
+    ymin = int((ymin - 5) / 5) * 5 if ymin > -95 or ymin < -105 else -105
+    ymax = int((ymax + 5) / 5) * 5 if ymax > ymin + 45 else ymin + 45
+    return ymin, ymax
+
+# Function to get channel start frequencies between low and high (MHz) at least 25 pixels apart
+def channel_ticks(country, low, high, axeswidth):
+    min_pixel_distance = 25
+    min_tick_distance = ((high - low) * min_pixel_distance) / axeswidth
+    x_ticks = []
+    prev = 0
+    for _, channel_low, _ in channel_index(country).channels_between(low, high):
+        if channel_low - prev >= min_tick_distance:
+            x_ticks.append(channel_low)
+            prev = channel_low
+    return x_ticks
+
+# Function to count how many plots, each a tuple of sorted x and y values, pass through each pixel of a
+# (width, height) grid over (xmin, xmax, ymin, ymax) limits, joining each column to the previous one
+def hit_counts(plots, limits, shape):
+    width, height = shape
+    counts = numpy.zeros((width, height + 1), dtype=numpy.int32)
+    if limits[1] <= limits[0]:
+        return counts[:, :height]
+    for x_values, y_values in plots:
+        columns = ((x_values - limits[0]) * (width / (limits[1] - limits[0]))).astype(numpy.int64).clip(0, width - 1)
+        rows = ((y_values - limits[2]) * (height / (limits[3] - limits[2]))).astype(numpy.int64).clip(0, height - 1)
+        starts = numpy.flatnonzero(numpy.concatenate(([True], columns[1:] != columns[:-1])))
+        low = numpy.minimum.reduceat(rows, starts)
+        high = numpy.maximum.reduceat(rows, starts)
+        previous = rows[starts[1:] - 1]
+        low[1:] = numpy.minimum(low[1:], previous)
+        high[1:] = numpy.maximum(high[1:], previous)
+        counts[columns[starts], low] += 1
+        counts[columns[starts], high + 1] -= 1
+    return numpy.cumsum(counts, axis=1)[:, :height]
+
+# Function to get plot arrays from sorted frequencies and levels, dropping to -200dBm across
+# gaps of more than twice the resolution
+def plot_arrays(freqs, levels, resolution):
+    gaps = numpy.flatnonzero(freqs[:-1] + resolution * 2 < freqs[1:])
+    indexes = numpy.repeat(gaps + 1, 2)
+    markers = numpy.column_stack((freqs[gaps] + resolution, freqs[gaps + 1] - resolution)).ravel()
+    return numpy.insert(freqs, indexes, markers), numpy.insert(levels, indexes, -200)
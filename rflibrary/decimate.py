@@ -0,0 +1,46 @@
+import numpy
+
+# Function to reduce a spectrum sorted by frequency for export, first to the lowest and highest
+# points in each bucket_width (MHz) wide frequency bucket, then to at most max_points points
+def decimate(freqs, levels, max_points=0, bucket_width=0):
+    if bucket_width > 0 and len(freqs) > 0:
+        freqs, levels = minmax_buckets(freqs, levels, bucket_starts((freqs - freqs[0]) / bucket_width))
+    if 1 < max_points < len(freqs):
+        freqs, levels = minmax_buckets(freqs, levels, numpy.unique(
+            numpy.linspace(0, len(freqs), max_points // 2, endpoint=False).astype(numpy.int64)))
+    return freqs, levels
+
+# Function to reduce a spectrum sorted by frequency to the first, last, lowest and highest points
+# in each of num_columns columns, so a line plot num_columns pixels wide draws identically
+def envelope(freqs, levels, num_columns):
+    if len(freqs) <= 4 * num_columns or freqs[-1] == freqs[0]:
+        return freqs, levels
+    starts = bucket_starts((freqs - freqs[0]) * (num_columns / (freqs[-1] - freqs[0])))
+    keep = extremes_mask(levels, starts)
+    keep[starts] = True
+    keep[starts[1:] - 1] = True
+    keep[-1] = True
+    return freqs[keep], levels[keep]
+
+# Function to keep the first lowest and first highest level points of buckets starting at the
+# given indexes, so peaks and troughs survive, in frequency order
+def minmax_buckets(freqs, levels, starts):
+    if len(starts) == 0:
+        return freqs, levels
+    keep = extremes_mask(levels, starts)
+    return freqs[keep], levels[keep]
+
+# Function to get indexes where the integer part of sorted bucket positions changes
+def bucket_starts(positions):
+    buckets = numpy.floor(positions).astype(numpy.int64)
+    return numpy.flatnonzero(numpy.concatenate(([True], buckets[1:] != buckets[:-1])))
+
+# Function to get a mask of the first lowest and first highest level in each bucket
+def extremes_mask(levels, starts):
+    counts = numpy.diff(numpy.append(starts, len(levels)))
+    positions = numpy.arange(len(levels))
+    keep = numpy.zeros(len(levels), dtype=bool)
+    for reduce in (numpy.maximum, numpy.minimum):
+        extremes = numpy.repeat(reduce.reduceat(levels, starts), counts)
+        keep[numpy.minimum.reduceat(numpy.where(levels == extremes, positions, len(levels)), starts)] = True
+    return keep
@@ -1,24 +1,60 @@
 import os
-import re
+import io
+import mmap
+import array
 import datetime
 import xml.etree.ElementTree
+import numpy
 import data
+from channels import channel_index
+from formats import format_csv
+from sidecar import read_sidecar, sidecar_filename, has_fresh_sidecar, InvalidSidecarError
+from sidecar import EXTENSION as SIDECAR_EXTENSION
+from units import to_hz, from_hz, to_fixed, from_fixed, FREQ_DTYPE, LEVEL_DTYPE, HZ_PER_MHZ, LEVEL_SCALE
+from units import compact_freqs, compact_levels, expand_freqs, expand_levels
 
 class InvalidFileError(Exception):
     "Invalid file"
 
-class File:
+# Read-only sequence of (frequency, level) pairs backed by a File's arrays
+class FrequencyView:
+    def __init__(self, freqs, levels):
+        self._freqs = freqs
+        self._levels = levels
+
+    def __len__(self):
+        return len(self._freqs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return FrequencyView(self._freqs[index], self._levels[index])
+        return (float(self._freqs[index]), float(self._levels[index]))
+
+    def __iter__(self):
+        return zip(self._freqs.tolist(), self._levels.tolist())
+
+# Files larger than this are sniffed rather than fully parsed when added lazily
+SNIFF_SIZE = 4096
+
+class File:  # pylint: disable=too-many-public-methods
     # Initialise class
-    def __init__(self, name, tv_country):
-        self.frequencies = []
+    def __init__(self, name, tv_country, **kwargs):
+        self._dtype = kwargs.get('dtype', numpy.float64)
+        self._freqs_hz = numpy.empty(0, dtype=FREQ_DTYPE)
+        self._levels_fixed = numpy.empty(0, dtype=LEVEL_DTYPE)
+        self._compact = kwargs.get('compact', False)
+        self._freq_base = 0
+        self._level_step = 1
+        self._cache = kwargs.get('cache')
+        self._loaded = True
         self.model = ''
         self.creation_date = datetime.datetime.now()
         self._start_frequency = None
         self._stop_frequency = None
         self.start_tv_channel = None
         self.stop_tv_channel = None
-        self.data_points = 0
-        self.resolution = 0
+        self._data_points = 0
+        self._resolution = 0
         self.new_filename = ''
         self.in_out = 0
         self.valid = None
@@ -28,12 +64,137 @@ class File:
         self.filename = os.path.basename(self.full_filename)
         self.file, self._ext = os.path.splitext(self.filename)
 
-        self.valid = self._read_file()
+        self.valid = self._read_file(kwargs.get('lazy', False))
         if self.valid:
             self.update_tv_channels()
             self._get_new_filename()
             self._io_read()
 
+    # Frequencies (integer Hz) and levels (fixed point), read-only
+    @property
+    def freqs_hz(self):
+        self.load()
+        return expand_freqs(self._freq_base, self._freqs_hz)
+
+    @property
+    def levels_fixed(self):
+        self.load()
+        return expand_levels(self._level_step, self._levels_fixed)
+
+    # Method to get (freqs_hz, levels_fixed) within a (low, high) Hz span, where high 0 is unlimited,
+    # as read-only slices that are only copied if stored compact
+    def slice_hz(self, span):
+        self.load()
+        limit = numpy.iinfo(self._freqs_hz.dtype).max
+        start = numpy.searchsorted(self._freqs_hz, min(max(span[0] - self._freq_base, 0), limit), side='left')
+        stop = len(self._freqs_hz)
+        if span[1] != 0:
+            stop = numpy.searchsorted(self._freqs_hz, min(max(span[1] - self._freq_base, -1), limit), side='right')
+        stop = max(start, stop)
+        return (expand_freqs(self._freq_base, self._freqs_hz[start:stop]),
+                expand_levels(self._level_step, self._levels_fixed[start:stop]))
+
+    # Memory used by stored arrays in bytes
+    @property
+    def nbytes(self):
+        return self._freqs_hz.nbytes + self._levels_fixed.nbytes
+
+    # Frequencies (MHz) and levels (dBm) as read-only arrays
+    @property
+    def freqs(self):
+        freqs = from_hz(self.freqs_hz, self._dtype)
+        freqs.flags.writeable = False
+        return freqs
+
+    @property
+    def levels(self):
+        levels = from_fixed(self.levels_fixed, self._dtype)
+        levels.flags.writeable = False
+        return levels
+
+    # Read-only list-like view of [frequency, level] pairs
+    @property
+    def frequencies(self):
+        return FrequencyView(self.freqs, self.levels)
+
+    # Number of points and mean resolution (MHz), which are only known once data is loaded
+    @property
+    def data_points(self):
+        self.load()
+        return self._data_points
+
+    @property
+    def resolution(self):
+        self.load()
+        return self._resolution
+
+    # True once data has been read, False while a lazily added file has only been sniffed
+    @property
+    def loaded(self):
+        return self._loaded
+
+    # Method to fully read a sniffed file, emptying it if it turns out to be invalid, returning whether
+    # it is valid
+    def load(self):
+        if not self._loaded:
+            self._loaded = True
+            try:
+                valid = self._read_file()
+            # A file that only had its first and last lines read can fail anywhere in its parser
+            except Exception:  # pylint: disable=broad-exception-caught
+                valid = False
+            self._set_loaded(valid)
+        return self.valid
+
+    # Method to take the data of a sniffed file from the same file parsed elsewhere, or None if it
+    # could not be read there
+    def load_from(self, parsed):
+        if self._loaded:
+            return
+        self._loaded = True
+        valid = parsed is not None and parsed.valid
+        if valid:
+            self.model = parsed.model
+            self.creation_date = parsed.creation_date
+            self._freqs_hz, self._freq_base = parsed._freqs_hz, parsed._freq_base
+            self._levels_fixed, self._level_step = parsed._levels_fixed, parsed._level_step
+            self._set_details(parsed.start_frequency, parsed.stop_frequency, parsed.data_points)
+        self._set_loaded(valid)
+
+    # Method to update details that depend on the frequency range once loaded, or empty an invalid file
+    def _set_loaded(self, valid):
+        self.valid = valid
+        if valid:
+            self.update_tv_channels()
+            self._get_new_filename()
+        else:
+            self._set_fixed_data(numpy.empty(0, dtype=FREQ_DTYPE), numpy.empty(0, dtype=LEVEL_DTYPE))
+
+    # Method to store parsed frequencies (MHz) and levels (dBm) as integer Hz and fixed point
+    def _set_data(self, freqs, levels):
+        self._set_fixed_data(to_hz(freqs), to_fixed(levels))
+
+    # Method to store integer arrays sorted by frequency
+    def _set_fixed_data(self, freqs_hz, levels_fixed):
+        self._freqs_hz = numpy.asarray(freqs_hz, dtype=FREQ_DTYPE)
+        self._levels_fixed = numpy.asarray(levels_fixed, dtype=LEVEL_DTYPE)
+        self._freq_base = 0
+        self._level_step = 1
+        if numpy.any(self._freqs_hz[1:] < self._freqs_hz[:-1]):
+            order = numpy.argsort(self._freqs_hz, kind='stable')
+            self._freqs_hz = self._freqs_hz[order]
+            self._levels_fixed = self._levels_fixed[order]
+        self._freqs_hz.flags.writeable = False
+        self._levels_fixed.flags.writeable = False
+
+    @property
+    def start_frequency(self):
+        return self._start_frequency
+
+    @property
+    def stop_frequency(self):
+        return self._stop_frequency
+
     def start_frequency_format(self):
         return None if self._start_frequency is None else f'{self._start_frequency:.3f}MHz'
 
@@ -46,86 +207,197 @@ class File:
     def date_format(self, date_format):
         return self.creation_date.strftime(date_format)
 
-    # Method to check validity and get file details
-    def _read_file(self):
+    # Method to check validity and get file details, only sniffing files that would be parsed if lazy
+    def _read_file(self, lazy=False):
         # Ensure file has valid extension
-        if self._ext.lower() != '.csv' and self._ext.lower() != '.sdb2':
+        if self._ext.lower() not in ('.csv', '.sdb2', SIDECAR_EXTENSION):
+            return False
+
+        # Map binary sidecar if there is one, else use previously parsed data if file is unchanged
+        cached = None
+        mapped = self._ext.lower() == SIDECAR_EXTENSION or has_fresh_sidecar(self.full_filename)
+        if mapped:
+            mapped = self._read_sidecar()
+            if not mapped and self._ext.lower() == SIDECAR_EXTENSION:
+                return False
+        if not mapped:
+            cached = None if self._cache is None else self._cache.get(self.full_filename)
+            if cached is not None:
+                self.model = cached['model']
+                self.creation_date = datetime.datetime.fromtimestamp(cached['creation_date'])
+                self._set_fixed_data(cached['freqs_hz'], cached['levels_fixed'])
+            elif lazy and self._sniff_file():
+                self._loaded = False
+                return True
+            else:
+                self._parse_file()
+        if len(self._freqs_hz) == 0:
             return False
+        if not mapped and cached is None and self._cache is not None:
+            self._cache.put(
+                self.full_filename,
+                self._freqs_hz,
+                self._levels_fixed,
+                {'model': self.model, 'creation_date': self.creation_date.timestamp()})
+
+        # Get file details
+        self._set_details(
+            float(self._freqs_hz[0] / HZ_PER_MHZ),
+            float(self._freqs_hz[-1] / HZ_PER_MHZ),
+            len(self._freqs_hz))
+
+        # Store in compact types where exact
+        if self._compact:
+            self._freq_base, self._freqs_hz = compact_freqs(self._freqs_hz)
+            self._level_step, self._levels_fixed = compact_levels(self._levels_fixed)
+        return True
+
+    # Method to memory map data from a binary sidecar, returning False if it can't be read
+    def _read_sidecar(self):
+        try:
+            freqs_hz, levels_fixed, metadata = read_sidecar(sidecar_filename(self.full_filename))
+        except (OSError, InvalidSidecarError):
+            return False
+        self.model = metadata.get('model', '')
+        self.creation_date = datetime.datetime.fromtimestamp(
+            metadata.get('creation_date', self.creation_date.timestamp()))
+        self._set_fixed_data(freqs_hz, levels_fixed)
+        return True
 
-        # Read first line of file
+    # Method to identify type of scan file from first line and parse
+    def _parse_file(self):
         with open(self.full_filename, 'r', encoding='utf-8') as file:
             first_line = file.readline().rstrip()
             file.seek(0)
 
-            # Identify type of scan file from first line and parse
             if first_line[0:11] == 'Model Type:':
-                self._parse_csv_scan(file, f'TTi {first_line[12:-1]}')
+                self._parse_csv_scan(f'TTi {first_line[12:-1]}')
             elif first_line[0:9] == 'Receiver;':
-                self._parse_wsm_scan(file)
+                self._parse_wsm_scan()
             elif first_line[0:38] == '<?xml version="1.0" encoding="UTF-8"?>':
                 self._parse_shure_scan(file)
             else:
-                self._parse_csv_scan(file, 'Generic')
-        if len(self.frequencies) == 0:
+                self._parse_csv_scan('Generic')
+
+    # Method to set file details from frequency range and number of points
+    def _set_details(self, start_frequency, stop_frequency, data_points):
+        self._start_frequency = start_frequency
+        self._stop_frequency = stop_frequency
+        self._data_points = data_points
+        self._resolution = ((self._stop_frequency - self._start_frequency)
+                           / (self._data_points - 1))
+
+    # Method to get model, date and frequency range without parsing data, returning False if the file
+    # is small or of a type that is parsed in full instead
+    def _sniff_file(self):
+        if os.path.getsize(self.full_filename) <= SNIFF_SIZE:
+            return False
+        with open(self.full_filename, 'rb') as file:
+            first_line = file.readline(SNIFF_SIZE)
+        if not first_line.endswith(b'\n'):
             return False
+        first_line = first_line.decode('utf-8').rstrip()
 
-        # Get file details
-        self._start_frequency = min(freq[0] for freq in self.frequencies)
-        self._stop_frequency = max(freq[0] for freq in self.frequencies)
-        self.data_points = len(self.frequencies)
-        self.resolution = ((self._stop_frequency - self._start_frequency)
-                          / (self.data_points - 1))
+        if first_line[0:11] == 'Model Type:':
+            return self._sniff_csv_scan(f'TTi {first_line[12:-1]}')
+        if first_line[0:9] == 'Receiver;':
+            return False
+        if first_line[0:38] == '<?xml version="1.0" encoding="UTF-8"?>':
+            return self._sniff_shure_scan()
+        return self._sniff_csv_scan('Generic')
+
+    # Method to get the frequency range of a CSV scan from the data lines in its first and last blocks,
+    # which hold the lowest and highest frequencies of a scan sorted either way
+    def _sniff_csv_scan(self, model):
+        with open(self.full_filename, 'rb') as file:
+            head = file.read(SNIFF_SIZE)
+            file.seek(-SNIFF_SIZE, os.SEEK_END)
+            tail = file.read()
+        first_freqs = parse_csv(numpy.frombuffer(head[:head.rfind(b'\n') + 1], dtype=numpy.uint8))[0]
+        last_freqs = parse_csv(numpy.frombuffer(tail[tail.find(b'\n') + 1:], dtype=numpy.uint8))[0]
+        if len(first_freqs) == 0 or len(last_freqs) == 0:
+            return False
+
+        self.model = model
+        self.get_creation_date()
+        freqs_hz = to_hz(numpy.concatenate((first_freqs, last_freqs)))
+        self._start_frequency = float(freqs_hz.min() / HZ_PER_MHZ)
+        self._stop_frequency = float(freqs_hz.max() / HZ_PER_MHZ)
+        return True
 
+    # Method to get details of a Shure scan from the attributes of its root and level data set
+    def _sniff_shure_scan(self):
+        with open(self.full_filename, 'rb') as file, \
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            root = parse_start_tag(buffer, buffer.find(b'<scan_data_source'))
+            data_set = parse_start_tag(buffer, buffer.find(b'<data_set '))
+        try:
+            self.model = shure_model(root.attrib)
+            self.creation_date = datetime.datetime.fromtimestamp(float(data_set.attrib['date_time']) / 1000)
+            self._start_frequency = round(float(data_set.attrib['start_freq']) * 1000) / HZ_PER_MHZ
+            self._stop_frequency = round(float(data_set.attrib['stop_freq']) * 1000) / HZ_PER_MHZ
+        except (AttributeError, KeyError, ValueError):
+            return False
         return True
 
     # Parse an XML scan created by Shure WWB6 and hardware
     def _parse_shure_scan(self, file):
-        tree = xml.etree.ElementTree.parse(file)
-        xmldoc = tree.getroot()
-        model = xmldoc.attrib['model']
-        if model in ('TODO', ''):
-            self.model = 'Shure AXT600'
-        else:
-            self.model = f'Shure {model} ({xmldoc.attrib["band"]})'
-        self.frequencies = []
-        for freq, level in zip(xmldoc[0][0], xmldoc[0][1]):
-            self.frequencies.append([float(freq.text) / 1000, float(level.text)])
-        self.creation_date = datetime.datetime.fromtimestamp(
-                            float(xmldoc[0][1].attrib['date_time']) / 1000)
+        freqs = array.array('q')
+        levels = numpy.empty(0, dtype=LEVEL_DTYPE)
+        num_levels = 0
+        set_index = -1
+        depth = 0
+        data_set = None
+
+        # Stream the frequency set then the level set, clearing elements once read
+        for event, element in xml.etree.ElementTree.iterparse(file, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    self.model = shure_model(element.attrib)
+                elif depth == 3:
+                    set_index += 1
+                    data_set = element
+                    if set_index == 1:
+                        self.creation_date = datetime.datetime.fromtimestamp(
+                            float(element.attrib['date_time']) / 1000)
+                        levels = numpy.empty(len(freqs), dtype=LEVEL_DTYPE)
+                continue
+
+            depth -= 1
+            if depth == 3:
+                if set_index == 0:
+                    freqs.append(round(float(element.text) * 1000))
+                elif set_index == 1 and num_levels < len(levels):
+                    levels[num_levels] = round(float(element.text) * LEVEL_SCALE)
+                    num_levels += 1
+                data_set.clear()
+            elif depth == 2:
+                element.clear()
+
+        self._set_fixed_data(numpy.frombuffer(freqs, dtype=FREQ_DTYPE, count=num_levels), levels[:num_levels])
 
     # Parse a CSV file
-    def _parse_csv_scan(self, file, model):
+    def _parse_csv_scan(self, model):
         self.model = model
-        for line in file:
-            split_line = re.split('[\t,;]', line)
-            try:
-                freq = float(split_line[0].strip())
-                value = float(split_line[1].strip())
-                self.frequencies.append([freq, value])
-            except ValueError:
-                pass
+        self._set_chunked_data(parse_csv_file(self.full_filename))
         self.get_creation_date()
 
     # Parse a WSM file
-    def _parse_wsm_scan(self, file):
+    def _parse_wsm_scan(self):
         self.model = 'Sennheiser WSM'
-        wsm_low_limit = -99
-        wsm_high_limit = -30
-        wsm_multiplier = wsm_low_limit - wsm_high_limit # -69
-        for line in file:
-            split_line = re.split('[    ,; ]', line)
-            try:
-                freq = float(split_line[0]) / 1000
-                value = wsm_low_limit - (float(split_line[2]) * 0.0065 * wsm_multiplier)
-                # -34.2 = -99 - (9988 * ? * -69)
-                # -64.8 / (9988 * -69) = 0,0065
-
-                if freq > 1:
-                    self.frequencies.append([freq, value])
-            except (ValueError, IndexError):
-                pass
+        self._set_chunked_data(parse_wsm_file(self.full_filename))
         self.get_creation_date()
 
+    # Method to store data parsed in chunks, converting each chunk to integer Hz and fixed point
+    def _set_chunked_data(self, chunks):
+        freqs_hz = [numpy.empty(0, dtype=FREQ_DTYPE)]
+        levels_fixed = [numpy.empty(0, dtype=LEVEL_DTYPE)]
+        for freqs, levels in chunks:
+            freqs_hz.append(to_hz(freqs))
+            levels_fixed.append(to_fixed(levels))
+        self._set_fixed_data(numpy.concatenate(freqs_hz), numpy.concatenate(levels_fixed))
+
     # Method to return creation date from file
     def get_creation_date(self):
         if data.SYSTEM == 'Mac':
@@ -135,22 +407,13 @@ class File:
             self.creation_date = datetime.datetime.fromtimestamp(
                 os.stat(self.full_filename).st_ctime)
 
-    # Method to get TV channels
-    def update_tv_channels(self, _=None):
-        if self._tv_country == 'United States of America':
-            self._tv_country = 'United States of America'
-        else:
-            self._tv_country = 'UK'
-        for chan in TV_CHANNELS[self._tv_country]:
-            if self.start_tv_channel is None:
-                if (self._start_frequency >= float(chan[1]) and
-                    self._start_frequency < float(chan[2])):
-                    self.start_tv_channel = chan[0]
-            else:
-                if (self._stop_frequency > float(chan[1]) and
-                    self._stop_frequency <= float(chan[2])):
-                    self.stop_tv_channel = chan[0]
-                    break
+    # Method to get TV channels, optionally for a new country or from a precomputed span
+    def update_tv_channels(self, country=None, span=None):
+        if country is not None:
+            self._tv_country = country
+        if span is None:
+            span = channel_index(self._tv_country).span(self._start_frequency, self._stop_frequency)
+        self.start_tv_channel, self.stop_tv_channel = span
 
     # Method to get new filename based on BestAudio naming structure
     def _get_new_filename(self):
@@ -189,161 +452,129 @@ class File:
             self.in_out = -1
 
     def get_output_file(self):
-        output_string = ''
-        for [freq, value] in self.frequencies:
-            output_string += f'{freq:09.4f},{value:09.4f}\n'
-        return output_string
-
-
-TV_CHANNELS = {
-    'UK': [
-        [1, 43.25, 50],
-        [2, 50, 55],
-        [3, 55, 60],
-        [4, 60, 65],
-        [5, 65, 70],
-        [6, 178, 183],
-        [7, 183, 188],
-        [8, 188, 193],
-        [9, 193, 198],
-        [10, 198, 203],
-        [11, 203, 208],
-        [12, 208, 213],
-        [13, 213, 218],
-        [21, 470, 478],
-        [22, 478, 486],
-        [23, 486, 494],
-        [24, 494, 502],
-        [25, 502, 510],
-        [26, 510, 518],
-        [27, 518, 526],
-        [28, 526, 534],
-        [29, 534, 542],
-        [30, 542, 550],
-        [31, 550, 558],
-        [32, 558, 566],
-        [33, 566, 574],
-        [34, 574, 582],
-        [35, 582, 590],
-        [36, 590, 598],
-        [37, 598, 606],
-        [38, 606, 614],
-        [39, 614, 622],
-        [40, 622, 630],
-        [41, 630, 638],
-        [42, 638, 646],
-        [43, 646, 654],
-        [44, 654, 662],
-        [45, 662, 670],
-        [46, 670, 678],
-        [47, 678, 686],
-        [48, 686, 694],
-        [49, 694, 702],
-        [50, 702, 710],
-        [51, 710, 718],
-        [52, 718, 726],
-        [53, 726, 734],
-        [54, 734, 742],
-        [55, 742, 750],
-        [56, 750, 758],
-        [57, 758, 766],
-        [58, 766, 774],
-        [59, 774, 782],
-        [60, 782, 790],
-        [61, 790, 798],
-        [62, 798, 806],
-        [63, 806, 814],
-        [64, 814, 822],
-        [65, 822, 830],
-        [66, 830, 838],
-        [67, 838, 846],
-        [68, 846, 854],
-        [69, 854, 862],
-        [70, 862, 870],
-        [71, 870, 878]
-    ],
-    'United States of America': [
-        [2, 54, 60],
-        [3, 60, 66],
-        [4, 66, 72],
-        [5, 76, 82],
-        [6, 82, 88],
-        [7, 174, 180],
-        [8, 180, 186],
-        [9, 186, 192],
-        [10, 192, 198],
-        [11, 198, 204],
-        [12, 204, 210],
-        [13, 210, 216],
-        [14, 470, 476],
-        [15, 476, 482],
-        [16, 482, 488],
-        [17, 488, 494],
-        [18, 494, 500],
-        [19, 500, 506],
-        [20, 506, 512],
-        [21, 512, 518],
-        [22, 518, 524],
-        [23, 524, 530],
-        [24, 530, 536],
-        [25, 536, 542],
-        [26, 542, 548],
-        [27, 548, 554],
-        [28, 554, 560],
-        [29, 560, 566],
-        [30, 566, 572],
-        [31, 572, 578],
-        [32, 578, 584],
-        [33, 584, 590],
-        [34, 590, 596],
-        [35, 596, 602],
-        [36, 602, 608],
-        [37, 608, 614],
-        [38, 614, 620],
-        [39, 620, 626],
-        [40, 626, 632],
-        [41, 632, 638],
-        [42, 638, 644],
-        [43, 644, 650],
-        [44, 650, 656],
-        [45, 656, 662],
-        [46, 662, 668],
-        [47, 668, 674],
-        [48, 674, 680],
-        [49, 680, 686],
-        [50, 686, 692],
-        [51, 692, 698],
-        [52, 698, 704],
-        [53, 704, 710],
-        [54, 710, 716],
-        [55, 716, 722],
-        [56, 722, 728],
-        [57, 728, 734],
-        [58, 734, 740],
-        [59, 740, 746],
-        [60, 746, 752],
-        [61, 752, 758],
-        [62, 758, 764],
-        [63, 764, 770],
-        [64, 770, 776],
-        [65, 776, 782],
-        [66, 782, 788],
-        [67, 788, 794],
-        [68, 794, 800],
-        [69, 800, 806],
-        [70, 806, 812],
-        [71, 812, 818],
-        [72, 818, 824],
-        [73, 824, 830],
-        [74, 830, 836],
-        [75, 836, 842],
-        [76, 842, 848],
-        [77, 848, 854],
-        [78, 854, 860],
-        [79, 860, 866],
-        [80, 866, 872],
-        [81, 872, 878],
-        [82, 878, 884],
-        [83, 884, 890]
-    ]
-}
+        return format_csv(self.freqs, self.levels)
+
+# Function to get the scanner model from the root attributes of a Shure scan
+def shure_model(attrib):
+    model = attrib['model']
+    if model in ('TODO', ''):
+        return 'Shure AXT600'
+    return f'Shure {model} ({attrib["band"]})'
+
+# Function to parse the attributes of the XML start tag at an offset in a buffer, or None if there is no
+# complete tag there
+def parse_start_tag(buffer, offset):
+    end = buffer.find(b'>', offset)
+    if offset == -1 or end == -1:
+        return None
+    try:
+        return xml.etree.ElementTree.fromstring(buffer[offset:end].rstrip(b'/') + b'/>')
+    except xml.etree.ElementTree.ParseError:
+        return None
+
+# Byte lookup table for bulk CSV parsing
+CSV_NUMERIC = numpy.zeros(256, dtype=bool)
+CSV_NUMERIC[numpy.frombuffer(b'0123456789+-.eE,;\t \r\n', dtype=numpy.uint8)] = True
+
+# Function to find line boundaries, mask lines where the first num_columns columns only contain numeric
+# characters and find where those columns end, so trailing text columns can be cut
+def find_numeric_lines(buffer, num_columns=2, delimiters=b'\t;'):
+    ends = numpy.flatnonzero(buffer == ord('\n'))
+    if len(ends) == 0 or ends[-1] != len(buffer) - 1:
+        ends = numpy.append(ends, len(buffer) - 1)
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    numeric_lines = ends > starts
+    cuts = ends.copy()
+    non_numeric = numpy.flatnonzero(~CSV_NUMERIC[buffer])
+    if len(non_numeric) == 0:
+        return starts, ends, numeric_lines, cuts
+
+    # Count delimiters before each non-numeric character in its line
+    is_delimiter = numpy.zeros(256, dtype=bool)
+    is_delimiter[numpy.frombuffer(delimiters + b',', dtype=numpy.uint8)] = True
+    delimiter_positions = numpy.flatnonzero(is_delimiter[buffer])
+    lines = numpy.searchsorted(ends, non_numeric)
+    first_delimiters = numpy.searchsorted(delimiter_positions, starts[lines])
+    in_columns = numpy.searchsorted(delimiter_positions, non_numeric) - first_delimiters < num_columns
+    numeric_lines[lines[in_columns]] = False
+
+    # Cut lines with text after the columns at the delimiter ending the columns
+    cuts[lines[~in_columns]] = delimiter_positions[first_delimiters[~in_columns] + num_columns - 1]
+    return starts, ends, numeric_lines, cuts
+
+# Size of chunks parsed at a time when reading CSV files through a memory map
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Function to parse a CSV file through a memory map in newline-aligned chunks,
+# yielding (freqs, levels) from the selected columns of each chunk
+def parse_csv_file(filename, usecols=(0, 1), delimiters=b'\t;'):
+    if os.path.getsize(filename) == 0:
+        return
+    with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        buffer = numpy.frombuffer(mapped, dtype=numpy.uint8)
+        try:
+            start = 0
+            while start < len(buffer):
+                stop = mapped.find(b'\n', min(start + READ_CHUNK_SIZE, len(buffer)) - 1)
+                stop = len(buffer) if stop == -1 else stop + 1
+                yield parse_csv(buffer[start:stop], usecols, delimiters)
+                start = stop
+        finally:
+            # Release the view so the map can be closed
+            del buffer
+
+# Function to parse a WSM file in chunks, yielding frequencies in MHz and RF levels converted to dBm
+def parse_wsm_file(filename):
+    wsm_low_limit = -99
+    wsm_high_limit = -30
+    wsm_multiplier = wsm_low_limit - wsm_high_limit # -69
+    for freqs, values in parse_csv_file(filename, (0, 2), b' ;'):
+        freqs = numpy.asarray(freqs, dtype=numpy.float64) / 1000
+        values = wsm_low_limit - (numpy.asarray(values, dtype=numpy.float64) * 0.0065 * wsm_multiplier)
+        # -34.2 = -99 - (9988 * ? * -69)
+        # -64.8 / (9988 * -69) = 0,0065
+
+        in_range = freqs > 1
+        yield freqs[in_range], values[in_range]
+
+# Function to parse two numeric columns of a CSV scan held in a byte array
+def parse_csv(buffer, usecols=(0, 1), delimiters=b'\t;'):
+    # Mask out header and footer lines containing non-numeric characters in the columns read
+    starts, ends, numeric_lines, cuts = find_numeric_lines(buffer, max(usecols) + 1, delimiters)
+    if not numeric_lines.any():
+        return numpy.empty(0), numpy.empty(0)
+
+    # Keep numeric lines without trailing text columns and normalise delimiters
+    keep = numpy.repeat(numeric_lines, ends - starts + 1)
+    cut_lines = numpy.flatnonzero(numeric_lines & (cuts < ends))
+    if len(cut_lines) > 0:
+        marks = numpy.zeros(len(buffer) + 1, dtype=numpy.int8)
+        marks[cuts[cut_lines]] = 1
+        marks[ends[cut_lines] + (buffer[ends[cut_lines]] != ord('\n'))] -= 1
+        keep &= numpy.cumsum(marks[:-1], dtype=numpy.int8) == 0
+    kept = buffer[keep]
+    for delimiter in delimiters:
+        kept[kept == delimiter] = ord(',')
+    text = kept.tobytes().decode('ascii')
+
+    # Convert both columns in one pass
+    try:
+        values = numpy.loadtxt(io.StringIO(text), delimiter=',', usecols=usecols, ndmin=2)
+        return values[:, 0], values[:, 1]
+    except ValueError:
+        return parse_csv_lines(text.splitlines(), usecols)
+
+# Function to parse CSV lines one at a time, skipping malformed lines
+def parse_csv_lines(lines, usecols=(0, 1)):
+    freqs = []
+    levels = []
+    for line in lines:
+        split_line = line.split(',')
+        try:
+            freq = float(split_line[usecols[0]].strip())
+            value = float(split_line[usecols[1]].strip())
+            freqs.append(freq)
+            levels.append(value)
+        except (ValueError, IndexError):
+            pass
+    return freqs, levels
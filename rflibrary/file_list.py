@@ -0,0 +1,215 @@
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+# Sortable columns with width in pixels, function to get a sort key and function to get cell text
+# given a file and date format
+COLUMNS = {
+    'File': (150, lambda file: file.filename.lower(), lambda file, _: file.filename),
+    'Date': (80, lambda file: file.creation_date, lambda file, date_format: file.date_format(date_format)),
+    'Scanner': (90, lambda file: file.model, lambda file, _: file.model),
+    'Start': (70, lambda file: file.start_frequency or 0, lambda file, _: f'{file.start_frequency or 0:.3f}'),
+    'Stop': (70, lambda file: file.stop_frequency or 0, lambda file, _: f'{file.stop_frequency or 0:.3f}'),
+    'TV': (60, lambda file: (file.start_tv_channel or 0, file.stop_tv_channel or 0), lambda file, _: (
+        '' if file.start_tv_channel is None else f'{file.start_tv_channel}-{file.stop_tv_channel}'))
+}
+
+# Batches of fewer than 1/INSERT_RATIO of the files listed are inserted one by one
+INSERT_RATIO = 16
+
+# Order of files sorted by a column then by the order added, kept up to date as files are added and
+# removed. Sort keys are unique, so a file's row is found by binary search.
+class FileOrder:
+    def __init__(self):
+        self.column = None
+        self.reverse = False
+        self._order = []
+        self._keys = {}
+        self._sequence = {}
+        self._added = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    # Method to get file shown in row
+    def file(self, row):
+        return self._order[len(self._order) - 1 - row if self.reverse else row]
+
+    # Method to get row of file, or None if file is not listed
+    def row(self, file):
+        if file not in self._keys:
+            return None
+        index = self._index(file)
+        return len(self._order) - 1 - index if self.reverse else index
+
+    # Method to sort by column, reversing the order if already sorted by column
+    def sort(self, column):
+        if column == self.column:
+            self.reverse = not self.reverse
+        else:
+            self.column = column
+            self.reverse = False
+        self.resort()
+
+    # Method to sort all files again, for when sort keys such as TV channels have changed
+    def resort(self):
+        self._keys = {file: self._key(file) for file in self._order}
+        self._order.sort(key=self._keys.get)
+
+    # Method to insert files in order, sorting everything once instead for batches that are large
+    # compared to the files already listed
+    def add(self, files):
+        for file in files:
+            self._sequence[file] = self._added
+            self._added += 1
+            self._keys[file] = self._key(file)
+        if len(files) * INSERT_RATIO < len(self._order):
+            for file in files:
+                bisect.insort(self._order, file, key=self._keys.get)
+        else:
+            self._order += files
+            self._order.sort(key=self._keys.get)
+
+    # Method to move listed files whose sort keys have changed, such as sniffed files once loaded
+    def update(self, files):
+        for file in files:
+            if file in self._keys and self._key(file) != self._keys[file]:
+                del self._order[self._index(file)]
+                self._keys[file] = self._key(file)
+                bisect.insort(self._order, file, key=self._keys.get)
+
+    def remove(self, file):
+        if file not in self._keys:
+            return
+        del self._order[self._index(file)]
+        del self._keys[file]
+        del self._sequence[file]
+
+    def clear(self):
+        del self._order[:]
+        self._keys.clear()
+        self._sequence.clear()
+
+    # Method to get the index of a listed file in sorted order
+    def _index(self, file):
+        return bisect.bisect_left(self._order, self._keys[file], key=self._keys.get)
+
+    # Method to get the sort key of a file, where ties keep the order added in either direction
+    def _key(self, file):
+        sequence = self._sequence[file]
+        if self.column is None:
+            return sequence
+        return (COLUMNS[self.column][1](file), -sequence if self.reverse else sequence)
+
+# Virtual list of files with sortable column headings, only filling the visible rows
+class FileList:
+    def __init__(self, parent, on_select, height=8):
+        self.order = FileOrder()
+        self.date_format = '%Y-%m-%d'
+        self.selected = None
+        self.top = 0
+        self.height = height
+        self._on_select = on_select
+
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=list(COLUMNS), show='headings', height=height,
+                                 selectmode='browse')
+        for column, (width, _, _) in COLUMNS.items():
+            self.tree.heading(column, text=column, command=lambda column=column: self._sort(column))
+            self.tree.column(column, width=width, minwidth=40, stretch=False)
+        for row in range(height):
+            self.tree.insert('', tk.END, iid=str(row))
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._yview)
+        x_scrollbar = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=x_scrollbar.set)
+        self.tree.grid(column=0, row=0, sticky='NWSE')
+        self.scrollbar.grid(column=1, row=0, sticky='NS')
+        x_scrollbar.grid(column=0, row=1, sticky='WE')
+
+        self.tree.bind('<ButtonRelease-1>', self._click)
+        self.tree.bind('<Up>', lambda _: self._step(-1))
+        self.tree.bind('<Down>', lambda _: self._step(1))
+        self.tree.bind('<MouseWheel>', lambda event: self._scroll(-1 if event.delta > 0 else 1))
+        self.tree.bind('<Button-4>', lambda _: self._scroll(-1))
+        self.tree.bind('<Button-5>', lambda _: self._scroll(1))
+
+    def add(self, files):
+        self.order.add(files)
+        self._redraw()
+
+    def update(self, files):
+        self.order.update(files)
+        self._redraw()
+
+    def remove(self, file):
+        self.order.remove(file)
+        self._redraw()
+
+    def clear(self):
+        self.order.clear()
+        self._redraw()
+
+    # Method to sort again and redraw, for when file details have changed
+    def refresh(self):
+        self.order.resort()
+        self._redraw()
+
+    # Method to highlight file (or None), scrolling it into view
+    def select(self, file):
+        self.selected = file
+        row = None if file is None else self.order.row(file)
+        if row is not None and not self.top <= row < self.top + self.height:
+            self.top = row if row < self.top else row - self.height + 1
+        self._redraw()
+
+    def _sort(self, column):
+        self.order.sort(column)
+        for heading in COLUMNS:
+            arrow = (' ▼' if self.order.reverse else ' ▲') if heading == column else ''
+            self.tree.heading(heading, text=heading + arrow)
+        self.select(self.selected)
+
+    # Method to fill visible rows and set scrollbar
+    def _redraw(self):
+        self.top = max(0, min(self.top, len(self.order) - self.height))
+        for row in range(self.height):
+            iid = str(row)
+            if self.top + row < len(self.order):
+                file = self.order.file(self.top + row)
+                self.tree.item(iid, values=[cell(file, self.date_format) for _, _, cell in COLUMNS.values()])
+                if file is self.selected:
+                    self.tree.selection_set(iid)
+                    continue
+            else:
+                self.tree.item(iid, values=[])
+            self.tree.selection_remove(iid)
+        if len(self.order) == 0:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.top / len(self.order), min(1, (self.top + self.height) / len(self.order)))
+
+    def _click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if iid != '' and self.top + int(iid) < len(self.order):
+            self._on_select(self.order.file(self.top + int(iid)))
+
+    # Method to select the file a number of rows from the selected file
+    def _step(self, rows):
+        if len(self.order) > 0:
+            row = self.order.row(self.selected) if self.selected is not None else None
+            row = self.top if row is None else max(0, min(row + rows, len(self.order) - 1))
+            self._on_select(self.order.file(row))
+        return 'break'
+
+    def _scroll(self, rows):
+        self.top += rows
+        self._redraw()
+        return 'break'
+
+    # Method to handle scrollbar moveto and scroll commands
+    def _yview(self, *args):
+        if args[0] == 'moveto':
+            self.top = int(float(args[1]) * len(self.order))
+        elif args[0] == 'scroll':
+            self.top += int(args[1]) * (self.height if args[2] == 'pages' else 1)
+        self._redraw()
@@ -0,0 +1,36 @@
+import numpy
+
+# Number of points formatted at a time
+CHUNK_SIZE = 65536
+
+# Function to format a spectrum as CSV in chunks of fixed-width lines
+def csv_chunks(freqs, levels):
+    for start in range(0, len(freqs), CHUNK_SIZE):
+        values = numpy.column_stack((
+            freqs[start:start + CHUNK_SIZE],
+            levels[start:start + CHUNK_SIZE])).ravel().tolist()
+        yield ('%09.4f,%09.4f\n' * (len(values) // 2)) % tuple(values)
+
+# Function to format a spectrum as a Sennheiser WSM scan in chunks, highest frequency first
+def wsm_chunks(freqs, levels, title, date, limits):
+    wsm_date = date.strftime('%Y-%m-%d 00:00:00')
+    yield (f'Receiver;{title}\n'
+           f'Date/Time;{wsm_date}\n'
+           'RFUnit;dBm\n\n\nFrequency Range [kHz];'
+           f'{(limits[0] * 1000):06d};'
+           f'{limits[1] * 1000:06d};\n'
+           'Frequency;RF level (%);RF level\n')
+    for stop in range(len(freqs), 0, -CHUNK_SIZE):
+        start = max(0, stop - CHUNK_SIZE)
+        values = numpy.column_stack((
+            (freqs[start:stop][::-1] * 1000).astype(numpy.int64),
+            levels[start:stop][::-1])).ravel().tolist()
+        yield ('%06d;;%04.1f\n' * (len(values) // 2)) % tuple(values)
+
+# Function to format a spectrum as CSV
+def format_csv(freqs, levels):
+    return ''.join(csv_chunks(freqs, levels))
+
+# Function to format a spectrum as a Sennheiser WSM scan
+def format_wsm(freqs, levels, title, date, limits):
+    return ''.join(wsm_chunks(freqs, levels, title, date, limits))
@@ -1,6 +1,7 @@
 # Standard library imports
 import os
 import sys
+import time
 import webbrowser
 
 # Tkinter GUI imports
@@ -28,8 +29,14 @@ from tooltip import ToolTip
 from settings_window import SettingsWindow
 from helpers import dir_format
 import settings
-from chart import Chart
-from file import InvalidFileError
+from chart import Chart, chart_views
+from cache import ParseCache
+from ingest import Ingestion, directory_files
+from progress import IngestionProgress
+from file_list import FileList
+from channels import channel_index
+from sidecar import sidecar_filename
+from units import to_hz, to_fixed
 from error import display_error
 import update
 
@@ -52,7 +59,13 @@ class GUI:
             default_library_location=settings.plist['default_library_location'],
             dir_structure=settings.plist['dir_structure'],
             low_freq_limit=settings.plist['low_freq_limit'],
-            high_freq_limit=settings.plist['high_freq_limit'])
+            high_freq_limit=settings.plist['high_freq_limit'],
+            merge_mode=settings.plist['merge_mode'],
+            merge_resolution=settings.plist['merge_resolution'],
+            merge_percentile=settings.plist['merge_percentile'],
+            export_max_points=settings.plist['export_max_points'],
+            export_bucket_width=settings.plist['export_bucket_width'],
+            cache=ParseCache())
 
         self.log = Log(settings.plist['logFolder'])
 
@@ -60,6 +73,8 @@ class GUI:
 
         self.file_listbox_selection = None
         self.settings_window_open = False
+        self._rejected_files = []
+        self._suppress_ingestion_errors = False
 
         # Create instance
         self.window = tk.Tk()
@@ -142,6 +157,16 @@ class GUI:
         self.output_frame.grid(column=0, row=1, columnspan=3, padx=8, pady=8, sticky='NWE')
 
         self.chart = Chart(self.preview_frame)
+        self.chart_view = tk.StringVar(value=chart_views[0])
+        chart_view_box = ttk.Combobox(
+            self.preview_frame,
+            textvariable=self.chart_view,
+            values=chart_views,
+            width=12,
+            state='readonly')
+        chart_view_box.pack(side=tk.BOTTOM, pady=data.PAD_Y_DEFAULT)
+        chart_view_box.bind('<<ComboboxSelected>>', lambda _: self._update_chart())
+        ToolTip(chart_view_box, 'Preview selected scan, all scans overlaid or scans over time').bind()
 
     # Create GUI menu
     def _create_menu(self):
@@ -315,10 +340,8 @@ class GUI:
     # Create GUI widgets
     def _create_input_frame(self):
         ttk.Label(self.input_frame, text='File List').grid(column=0, row=0, sticky='W')
-        self.file_listbox = tk.Listbox(self.input_frame, height=8, width=20)
-        self.file_listbox.bind('<<ListboxSelect>>', self._select_file_item)
-        self.file_listbox.grid(column=0, row=1, padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
-        self.file_listbox.configure(background='#ffffff', fg='#000000')
+        self.file_list = FileList(self.input_frame, self._select_file_item)
+        self.file_list.frame.grid(column=0, row=1, padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
 
         ttk.Label(
             self.input_frame,
@@ -366,8 +389,13 @@ class GUI:
             padx=data.PAD_X_DEFAULT,
             pady=data.PAD_Y_DEFAULT)
 
-        self.file_listbox.bind('<Escape>', self._deselect_file_listbox)
-        self.file_listbox.bind('<BackSpace>', self._remove_file)
+        # Progress of files being added in the background
+        self.progress = IngestionProgress(self.input_frame, self._add_ingested_files, self._finish_ingestion)
+        self.progress.frame.grid(column=0, row=3, columnspan=2, sticky='WE')
+        self.progress.frame.grid_remove()
+
+        self.file_list.tree.bind('<Escape>', self._deselect_file_listbox)
+        self.file_list.tree.bind('<BackSpace>', self._remove_file)
 
     def _create_info_frame(self):
         self.venue_entry = self._make_entry_box('Venue', 'Scan location name', self.venue, 0)
@@ -454,7 +482,8 @@ class GUI:
         self.output_buttons = ttk.Frame(self.output_frame)
         self.output_buttons.grid(column=2, row=5, sticky='W')
 
-        self._make_op_button('Create File', f'Create master file ({data.COMMAND_SYMBOL}\u23ce)', self._create_file, 0)
+        self.create_file_button = self._make_op_button(
+            'Create File', f'Create master file ({data.COMMAND_SYMBOL}\u23ce)', self._create_file, 0)
         self._make_op_button(
             'Set Destination',
             f'Set custom destination for output files ({data.COMMAND_SYMBOL}{data.MODIFIER_SYMBOL}D)',
@@ -525,22 +554,19 @@ class GUI:
         return button
 
     # Method to update filelist
-    def _print_files(self, event=None):
-        self.file_listbox.delete(0, tk.END)
-        for file in self.output.files:
-            self.file_listbox.insert(tk.END, file.filename)
+    def _print_files(self):
+        self.file_list.date_format = self.output.date_format
         self.scan_date.set(self.output.formatted_date())
-        self._select_file_item(event)
+        self._select_file_item()
         self._update_file_status()
         self._set_master_filename()
 
-    # Method to select file_listbox item
-    def _select_file_item(self, event=None):
-        if event:
-            try:
-                self.file_listbox_selection = int(event.widget.curselection()[0])
-            except (AttributeError, IndexError):
-                pass
+    # Method to select file in file list, or show the current selection if file is None
+    def _select_file_item(self, file=None):
+        if file is not None:
+            self.file_listbox_selection = self.output.files.index(file)
+        selection = self.file_listbox_selection
+        self.file_list.select(None if selection is None else self.output.files[selection])
         self._print_file_data()
 
     # Method to print file data to data_listbox
@@ -548,7 +574,6 @@ class GUI:
         self.data_listbox.delete(0, tk.END)
         if self.file_listbox_selection is None:
             self.data_listbox.insert(tk.END, 'No file selected')
-            self.chart.clear()
         else:
             selected_file = self.output.files[self.file_listbox_selection]
             self.data_listbox.insert(tk.END, f'Filename: {selected_file.filename}')
@@ -561,23 +586,45 @@ class GUI:
             self.data_listbox.insert(tk.END, f'Data Points: {selected_file.data_points}')
             self.data_listbox.insert(tk.END, f'Mean Resolution: {selected_file.resolution_format()}')
             self.data_listbox.insert(tk.END, f'New Filename: {selected_file.new_filename}')
-            self.chart.update(selected_file, self.output.country)
+        self._update_chart()
         self._button_disable()
 
-    # Method to decide if buttons should be disabled or not
+    # Method to draw selected chart view, previewing the master file if no file is selected
+    def _update_chart(self):
+        view = self.chart_view.get()
+        if self.output.num_files() == 0:
+            self.chart.clear()
+        elif view == 'Overlay':
+            self.chart.update_overlay(
+                [file for file in self.output.files if file.loaded and file.data_points > 0],
+                self.output.master if len(self.output.master) > 0 else None,
+                self.output.country)
+        elif view == 'Waterfall' and self.output.waterfall.span is not None:
+            self.chart.update_waterfall(self.output.waterfall, self.output.country)
+        elif self.file_listbox_selection is not None and view == 'Scan':
+            self.chart.update(self.output.files[self.file_listbox_selection], self.output.country)
+        elif view == 'Scan' and len(self.output.master) > 0:
+            self.chart.update(self.output.master, self.output.country)
+        else:
+            self.chart.clear()
+
+    # Method to decide if buttons should be disabled or not, with output disabled while adding files
     def _button_disable(self):
         if self.output.num_files() == 0:
             self._button_status('disabled', 'disabled')
-        elif self.file_listbox_selection is None:
-            self._button_status('disabled', 'enabled')
         else:
-            self._button_status('enabled', 'enabled')
+            self._button_status(
+                'disabled' if self.file_listbox_selection is None else 'enabled',
+                'disabled' if self.progress.running else 'enabled')
 
     # Method to print number of files chosen
     def _update_file_status(self):
         plural = '' if self.output.num_files() == 1 else 's'
         self.file_status.configure(foreground='red' if self.output.num_files() == 0 else 'black')
-        self.num_files.set(f'{self.output.num_files()} file{plural} added')
+        status = f'{self.output.num_files()} file{plural} added'
+        if self.output.num_files() > 0:
+            status += f' ({len(self.output.master):,} points in master)'
+        self.num_files.set(status)
 
     # Method to create master filename
     def _set_master_filename(self, _=None):
@@ -602,6 +649,7 @@ class GUI:
                 os.path.join(data.ICON_LOCATION, f'bin_{output_status}.png')))
             self.clear_files_button.config(state=output_status, image=img)
             self.clear_files_button.image = img
+            self.create_file_button.config(state=output_status)
             if output_status == 'enabled':
                 self.window.bind_all(f'<{data.COMMAND}d>', self._use_date)
                 self.window.bind_all(f'<{data.COMMAND}D>', self._use_date)
@@ -627,15 +675,14 @@ class GUI:
     # Method to refresh file data, for use when country or settings change
     def _refresh(self, _=None):
         self.output.set_date_format(settings.plist['default_date_format'])
+        self.output.apply_settings(settings.plist)
         log.folder = settings.plist['logFolder']
-        for file in self.output.files:
-            file.update_tv_channels(self.output.country)
+        self.file_list.refresh()
         self._print_files()
 
     # Method to deselect file_listbox
-    def _deselect_file_listbox(self):
+    def _deselect_file_listbox(self, _=None):
         self.file_listbox_selection = None
-        self.file_listbox.selection_clear(0, tk.END)
         self._select_file_item()
 
     # Method called after IO_box edited
@@ -667,50 +714,88 @@ class GUI:
 
     # Method to open file dialogue and allow selection of files
     def _add_files(self, _=None, selected_files=None, suppress_errors=False):
+        if self.progress.running:
+            return
         if selected_files is None:
             selected_files = tkfiledialog.askopenfilenames(
                 parent=self.input_frame,
                 title='Add files',
                 initialdir=settings.plist['defaultSourceLocation'])
-        for file in selected_files:
-            try:
-                self.output.add_file(file, self.output.country)
-                settings.plist['defaultSourceLocation'] = os.path.dirname(file)
-            except InvalidFileError:
-                if not suppress_errors:
-                    tkmessagebox.showwarning(
-                        'Invalid File',
-                        f'{file} is not a valid scan file and will not be added to the file list')
+        if len(selected_files) == 0:
+            return
+
+        # Parse files in the background, adding them as they arrive
+        self._suppress_ingestion_errors = suppress_errors
+        self._rejected_files = []
+        self.progress.start(Ingestion(
+            selected_files,
+            self.output.country,
+            cache=self.output.cache,
+            compact=self.output.compact,
+            lazy=True))
+        self._button_disable()
+
+    # Method to add a batch of (filename, File or None) parsed in the background, where files added while
+    # only sniffed come again once loaded
+    def _add_ingested_files(self, results):
+        loaded_files = [new_file for _, new_file in results if self.output.is_loading(new_file)]
+        new_files = [new_file for _, new_file in results
+                     if new_file is not None and new_file.valid and not self.output.is_loading(new_file)]
+        self._rejected_files += [filename for filename, new_file in results if new_file is None or not new_file.valid]
+        self._unlist_files(self.output.load_files(loaded_files))
+        self.file_list.update(loaded_files)
+        if len(new_files) > 0:
+            self.output.add_files(new_files, self.output.country)
+            self.file_list.add(new_files)
+            settings.plist['defaultSourceLocation'] = os.path.dirname(new_files[-1].full_filename)
         self._set_io()
         self._print_files()
 
+    # Method to unlist files removed from the output, keeping the selected file selected
+    def _unlist_files(self, files):
+        for file in files:
+            self.file_list.remove(file)
+        selected_file = self.file_list.selected
+        if len(files) > 0 and selected_file is not None:
+            self.file_listbox_selection = None if selected_file in files else self.output.files.index(selected_file)
+
+    # Method to remove files not loaded when adding files was cancelled, and list all rejected files once
+    # adding files has finished
+    def _finish_ingestion(self):
+        self._unlist_files(self.output.remove_loading_files())
+        self._print_files()
+        if self._rejected_files and not self._suppress_ingestion_errors:
+            invalid_list = '\n'.join(os.path.basename(file) for file in self._rejected_files)
+            tkmessagebox.showwarning(
+                'Invalid File',
+                f'The following files are not valid scan files and will not be added to the file list:\n\n'
+                f'{invalid_list}')
+
     # Method to open file dialogue and allow selection of all files in a directory
     def _add_directory(self, _=None):
-        dir_files = []
         selected_dir = tkfiledialog.askdirectory(
             parent=self.input_frame, title='Add directory',
             initialdir=settings.plist['defaultSourceLocation'])
         if selected_dir != '':
             settings.plist['defaultSourceLocation'] = selected_dir
-            for file in os.listdir(selected_dir):
-                fullfilename = os.path.join(selected_dir, file)
-                if not file.startswith('.') and not os.path.isdir(fullfilename):
-                    dir_files.append(fullfilename)
-        if len(dir_files) != 0:
-            self._add_files(None, dir_files, True)
+            dir_files = directory_files(selected_dir)
+            if len(dir_files) != 0:
+                self._add_files(None, dir_files, True)
 
     # Method to remove file
     def _remove_file(self, event=None):
         if event is None or (event.widget.winfo_class() != 'TEntry' and event.widget.winfo_class() != 'TCombobox'):
             if self.file_listbox_selection is None:
                 return
-            self.output.remove_file(self.output.files[self.file_listbox_selection])
+            removed_file = self.output.files[self.file_listbox_selection]
+            self.output.remove_file(removed_file)
+            self.file_list.remove(removed_file)
             self._set_io()
             if self.output.num_files() == 0:
                 self.file_listbox_selection = None
             elif self.file_listbox_selection > len(self.output.files) - 1:
                 self.file_listbox_selection = len(self.output.files) - 1
-            self._print_files(event)
+            self._print_files()
 
     # Method to remove all files
     def _clear_files(self, _=None, confirm_required=True):
@@ -721,7 +806,9 @@ class GUI:
                 'Are you sure you want to clear the file list?'):
                 self.edit_menu.entryconfig('Clear Files', state='normal')
                 return
+        self.progress.cancel(discard=True)
         self.output.clear_files()
+        self.file_list.clear()
         self.file_listbox_selection = None
         self._print_files()
 
@@ -732,6 +819,8 @@ class GUI:
 
     # Method to create master file
     def _create_file(self, _=None):
+        if self.progress.running:
+            return
         if self.output.num_files() == 0:
             tkmessagebox.showinfo('No Files To Create', 'No files to create.')
             return
@@ -746,7 +835,7 @@ class GUI:
         files_written = 0
         statement = ('The following files were successfully written!\n\n'
                      f'DIRECTORY:\n{self.output.scan_output_location}\n\n')
-        output_file = self.output.write_output_file()
+        merged = self.output.merge()
 
         # Write original files with new filenames
         if self._create_directory():
@@ -755,30 +844,36 @@ class GUI:
                     written_filename = self._write_file(
                         self.output.scan_output_location,
                         file.new_filename,
-                        file.get_output_file())
+                        (file.freqs, file.levels))
                     if not written_filename:
                         return
                     files_written += 1
                     statement += f'{written_filename}\n'
+                    self._write_sidecar(written_filename, (file.freqs_hz, file.levels_fixed), {
+                        'model': file.model, 'creation_date': file.creation_date.timestamp(),
+                        'tv_channels': [file.start_tv_channel, file.stop_tv_channel]})
 
             # Write master file
-            if len(output_file) > 0:
+            if len(merged[0]) > 0:
                 written_filename = self._write_file(
                     self.output.scan_output_location,
                     self.output.scan_master_filename,
-                    output_file)
+                    merged)
                 if not written_filename:
                     return
                 files_written += 1
                 statement += f'{written_filename}\n'
+                self._write_sidecar(written_filename, (to_hz(merged[0]), to_fixed(merged[1])), {
+                    'model': 'Master', 'creation_date': time.mktime(self.output.scan_datetimestamp.timetuple()),
+                    'tv_channels': channel_index(self.output.country).span(merged[0][0], merged[0][-1])})
 
             # Write WSM file
-            wsm_file = self.output.write_wsm_file(data.TITLE)
-            if (data.MAKE_WSM and len(wsm_file) > 0):
+            if data.MAKE_WSM:
                 written_filename = self._write_file(
                     self.output.scan_output_location,
                     self.output.scan_master_filename,
-                    wsm_file)
+                    merged,
+                    wsm=True)
                 if not written_filename:
                     return
                 files_written += 1
@@ -820,12 +915,33 @@ class GUI:
                     f'{statement}\nWould you like to clear the file list?'):
                     self._clear_files(False)
 
-    # Method to write file to disk
-    def _write_file(self, directory, filename, string):
+    # Method to write (freqs, levels) spectrum to disk
+    def _write_file(self, directory, filename, spectrum, wsm=False):
         full_filename = self.writer.get_filename(directory, filename)
-        if self.writer.write_file(full_filename, string) is False:
+        if wsm:
+            written = self.writer.write_wsm_file(
+                full_filename,
+                spectrum,
+                self.output.scan_datetimestamp,
+                (self.output.low_freq_limit, self.output.high_freq_limit))
+        else:
+            written = self.writer.write_csv_file(full_filename, spectrum)
+        if written is False:
             tkmessagebox.showwarning('Fail!', f'{filename} could not be written.')
-        return filename
+        return os.path.basename(full_filename)
+
+    # Method to write binary sidecar next to a written file if enabled in settings
+    def _write_sidecar(self, filename, spectrum_fixed, metadata):
+        if not settings.plist['write_sidecars']:
+            return
+        metadata.update({
+            'venue': self.output.venue,
+            'town': self.output.town,
+            'country': self.output.country,
+            'in_out': self.output.in_out})
+        full_filename = sidecar_filename(os.path.join(self.output.scan_output_location, filename))
+        if self.writer.write_sidecar_file(full_filename, spectrum_fixed, metadata) is False:
+            tkmessagebox.showwarning('Fail!', f'{os.path.basename(full_filename)} could not be written.')
 
     # Method to create directory structure
     def _create_directory(self):
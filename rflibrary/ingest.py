@@ -0,0 +1,115 @@
+import os
+import queue
+import threading
+import concurrent.futures
+from output import load_file, POOL_THRESHOLD
+from sidecar import sidecar_filename
+
+# Batch of files parsed on a background thread (with a process pool for large batches), posting
+# (filename, File or None if it could not be read) to a queue in the order given. If lazy, all files are
+# sniffed and posted first, then parsed and posted again once loaded.
+class Ingestion:
+    def __init__(self, files, country, **kwargs):
+        self.files = list(files)
+        self.country = country
+        self.cache = kwargs.get('cache')
+        self.compact = kwargs.get('compact', False)
+        self.lazy = kwargs.get('lazy', False)
+        self.workers = min(kwargs.get('workers') or os.cpu_count() or 1, len(self.files))
+        self.completed = 0
+        self.finished = False
+        self._results = queue.Queue()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @property
+    def total(self):
+        return len(self.files)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def start(self):
+        self._thread.start()
+
+    # Method to stop parsing, files already parsed are still returned by results
+    def cancel(self):
+        self._cancelled.set()
+
+    # Method to get (filename, File or None) results posted so far without blocking, where sniffed files
+    # are loaded on this thread and returned again unless they were sniffed in the same batch
+    def results(self):
+        results = []
+        sniffed = set()
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return results
+            if result is None:
+                self.finished = True
+                return results
+            filename, new_file = result[:2]
+            if len(result) == 3:
+                new_file.load_from(result[2])
+            if new_file is None or new_file.loaded:
+                self.completed += 1
+            if len(result) == 3 and new_file in sniffed:
+                continue
+            if new_file is not None and not new_file.loaded:
+                sniffed.add(new_file)
+            results.append((filename, new_file))
+
+    def _run(self):
+        try:
+            if not self.lazy:
+                for result in self._parse(self.files):
+                    self._results.put(result)
+                return
+            sniffed = self._sniff()
+            for (file, new_file), (_, parsed) in zip(sniffed, self._parse([file for file, _ in sniffed])):
+                self._results.put((file, new_file, parsed))
+        finally:
+            self._results.put(None)
+
+    # Method to sniff and post all files, returning (filename, File) of those still to be loaded
+    def _sniff(self):
+        sniffed = []
+        for file in self.files:
+            if self.cancelled:
+                break
+            new_file = load_file(file, self.country, self.cache, self.compact, lazy=True)
+            self._results.put((file, new_file))
+            if new_file is not None and not new_file.loaded:
+                sniffed.append((file, new_file))
+        return sniffed
+
+    # Generator of (filename, File or None) for files parsed in the order given until cancelled
+    def _parse(self, files):
+        if self.workers <= 1 or len(files) < POOL_THRESHOLD:
+            for file in files:
+                if self.cancelled:
+                    return
+                yield file, load_file(file, self.country, self.cache, self.compact)
+            return
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(load_file, file, self.country, self.cache, self.compact) for file in files]
+            for file, future in zip(files, futures):
+                if self.cancelled:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    return
+                try:
+                    parsed = future.result()
+                # A worker that dies or a result that can't be returned rejects only that file
+                except Exception:  # pylint: disable=broad-exception-caught
+                    parsed = None
+                yield file, parsed
+
+# Function to list the files in a directory to add, skipping hidden files, subdirectories and the binary
+# sidecars of files being added, which are read from their sidecar anyway
+def directory_files(directory):
+    files = [os.path.join(directory, file) for file in os.listdir(directory)
+             if not file.startswith('.') and not os.path.isdir(os.path.join(directory, file))]
+    sidecars = {sidecar_filename(file) for file in files if sidecar_filename(file) != file}
+    return [file for file in files if file not in sidecars]
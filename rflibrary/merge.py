@@ -0,0 +1,214 @@
+import numpy
+from file import FrequencyView
+from units import to_hz, from_hz, from_fixed, FREQ_DTYPE, LEVEL_DTYPE, HZ_PER_MHZ
+
+# Function to merge sorted (freqs, levels) runs into one spectrum,
+# keeping the highest level where frequencies are duplicated
+def merge_runs(runs):
+    if len(runs) == 0:
+        return numpy.empty(0), numpy.empty(0)
+    freqs = numpy.concatenate([run[0] for run in runs])
+    levels = numpy.concatenate([run[1] for run in runs])
+    if len(freqs) == 0:
+        return freqs, levels
+
+    # Stable sort merges the pre-sorted runs, then dedupe in one linear pass
+    order = numpy.argsort(freqs, kind='stable')
+    freqs = freqs[order]
+    levels = levels[order]
+    starts = numpy.flatnonzero(numpy.concatenate(([True], freqs[1:] != freqs[:-1])))
+    return freqs[starts], numpy.maximum.reduceat(levels, starts)
+
+# Maximum number of resampled values held in memory at once
+RESAMPLE_CHUNK_VALUES = 4 * 1024 * 1024
+
+# Function to get the typical frequency step of a sorted scan, 0 if it has one point
+def run_resolution(freqs):
+    if len(freqs) < 2:
+        return 0
+    return float(numpy.median(numpy.diff(freqs)))
+
+# Function to resample sorted (freqs, levels) runs onto a common grid and combine them
+# with mode 'max', 'min', 'mean' or 'percentile', resolution 0 using the finest input resolution
+def resample_runs(runs, mode='max', resolution=0, percentile=50):
+    runs = [(numpy.asarray(run[0], dtype=numpy.float64), numpy.asarray(run[1], dtype=numpy.float64))
+            for run in runs if len(run[0]) > 0]
+    resolutions = [run_resolution(run[0]) for run in runs]
+    if resolution <= 0:
+        resolution = min((step for step in resolutions if step > 0), default=0)
+    if resolution <= 0 or len(runs) == 0:
+        return merge_runs(runs)
+
+    # Drop grid points not covered by any scan
+    chunks = [(grid[covered], combine_levels(values[:, covered], mode, percentile))
+              for grid, values, covered in resample_chunks(runs, resolutions, resolution)]
+    freqs, levels = zip(*chunks)
+    return numpy.concatenate(freqs), numpy.concatenate(levels)
+
+# Function to yield chunks of the common grid, the runs' levels resampled onto it
+# (NaN where a run has no data) and a mask of grid points covered by any run
+def resample_chunks(runs, resolutions, resolution):
+    start = min(run[0][0] for run in runs)
+    num_points = int(numpy.floor((max(run[0][-1] for run in runs) - start) / resolution + 1e-9)) + 1
+    chunk_size = max(1, RESAMPLE_CHUNK_VALUES // len(runs))
+    for chunk_start in range(0, num_points, chunk_size):
+        grid = start + numpy.arange(chunk_start, min(num_points, chunk_start + chunk_size)) * resolution
+        values = numpy.full((len(runs), len(grid)), numpy.nan)
+        for run, run_step, row in zip(runs, resolutions, values):
+            resample_run(run, run_step, grid, row)
+        yield grid, values, ~numpy.all(numpy.isnan(values), axis=0)
+
+# Function to combine columns of resampled levels, ignoring NaN values
+def combine_levels(values, mode, percentile=50):
+    if mode == 'max':
+        return numpy.nanmax(values, axis=0)
+    if mode == 'min':
+        return numpy.nanmin(values, axis=0)
+    if mode == 'mean':
+        return numpy.nanmean(values, axis=0)
+    if mode == 'percentile':
+        return numpy.nanpercentile(values, percentile, axis=0)
+    raise ValueError(f'Unknown merge mode: {mode}')
+
+# Function to linearly interpolate a sorted run onto grid, writing into out,
+# leaving points outside the run or inside gaps wider than two steps untouched
+def resample_run(run, resolution, grid, out):
+    freqs, levels = run
+    first = numpy.searchsorted(grid, freqs[0], side='left')
+    last = numpy.searchsorted(grid, freqs[-1], side='right')
+    inner = grid[first:last]
+    if len(inner) == 0:
+        return
+    values = numpy.interp(inner, freqs, levels)
+    if len(freqs) > 1:
+        upper = numpy.searchsorted(freqs, inner, side='left').clip(1, len(freqs) - 1)
+        in_gap = freqs[upper] - freqs[upper - 1] > 2 * resolution
+        in_gap &= (freqs[upper] != inner) & (freqs[upper - 1] != inner)
+        values[in_gap] = numpy.nan
+    out[first:last] = values
+
+# Merged spectrum of a set of sources (objects like File with start_frequency, stop_frequency
+# and slice_hz), kept up to date as sources are added and removed
+class MasterSpectrum:
+    def __init__(self, limits=(0, 0)):
+        self.limits = None
+        self.version = 0
+        self._limits_hz = None
+        self._sources = []
+        self._pending = []
+        self._freqs_hz = numpy.empty(0, dtype=FREQ_DTYPE)
+        self._levels_fixed = numpy.empty(0, dtype=LEVEL_DTYPE)
+        self.set_limits(limits)
+
+    def __len__(self):
+        return len(self.freqs_hz)
+
+    @property
+    def freqs_hz(self):
+        self._flush()
+        return self._freqs_hz
+
+    @property
+    def levels_fixed(self):
+        self._flush()
+        return self._levels_fixed
+
+    @property
+    def freqs(self):
+        return from_hz(self.freqs_hz)
+
+    @property
+    def levels(self):
+        return from_fixed(self.levels_fixed)
+
+    # Merged frequencies (MHz) and levels (dBm)
+    @property
+    def spectrum(self):
+        return self.freqs, self.levels
+
+    @property
+    def frequencies(self):
+        return FrequencyView(self.freqs, self.levels)
+
+    @property
+    def resolution(self):
+        freqs_hz = self.freqs_hz
+        if len(freqs_hz) < 2:
+            return 0
+        return (freqs_hz[-1] - freqs_hz[0]) / HZ_PER_MHZ / (len(freqs_hz) - 1)
+
+    # Method to get the parts of all sources within limits as frequencies (MHz) and levels (dBm)
+    def runs(self):
+        return [(from_hz(freqs_hz), from_fixed(levels_fixed))
+                for freqs_hz, levels_fixed in (self._slice(source) for source in self._sources + self._pending)]
+
+    # Method to queue a source, merged into the spectrum when next read
+    def add(self, source):
+        self._pending.append(source)
+
+    # Method to remove a source, rebuilding only the frequency span it covered
+    def remove(self, source):
+        for index, pending in enumerate(self._pending):
+            if pending is source:
+                del self._pending[index]
+                return
+        self._sources = [other for other in self._sources if other is not source]
+        freqs_hz, _ = self._slice(source)
+        if len(freqs_hz) == 0:
+            return
+        span = (freqs_hz[0], freqs_hz[-1])
+        merged_freqs, merged_levels = merge_runs([self._slice(other, span) for other in self._sources])
+        start, stop = span_indexes(self._freqs_hz, span)
+        self._set_data(
+            numpy.concatenate((self._freqs_hz[:start], merged_freqs, self._freqs_hz[stop:])),
+            numpy.concatenate((self._levels_fixed[:start], merged_levels, self._levels_fixed[stop:])))
+
+    def clear(self):
+        del self._sources[:]
+        del self._pending[:]
+        self._set_data(numpy.empty(0, dtype=FREQ_DTYPE), numpy.empty(0, dtype=LEVEL_DTYPE))
+
+    # Method to change frequency limits (MHz), remerging all sources if they differ
+    def set_limits(self, limits):
+        if self.limits is not None and tuple(limits) == tuple(self.limits):
+            return
+        self.limits = limits
+        self._limits_hz = (int(to_hz(limits[0])), int(to_hz(limits[1])))
+        self._pending = self._sources + self._pending
+        self._sources = []
+        self._set_data(numpy.empty(0, dtype=FREQ_DTYPE), numpy.empty(0, dtype=LEVEL_DTYPE))
+
+    # Method to splice pending sources into the merged spectrum
+    def _flush(self):
+        if len(self._pending) == 0:
+            return
+        runs = [(self._freqs_hz, self._levels_fixed)] + [self._slice(source) for source in self._pending]
+        self._sources += self._pending
+        self._pending = []
+        self._set_data(*merge_runs(runs))
+
+    # Method to get the part of a source within limits and an optional (low, high) span in Hz,
+    # skipping sources entirely outside without reading their data
+    def _slice(self, source, span=None):
+        low, high = self._limits_hz
+        if span is not None:
+            low = max(low, span[0])
+            high = span[1] if high == 0 else min(high, span[1])
+        if (round(source.stop_frequency * HZ_PER_MHZ) < low
+                or high != 0 and round(source.start_frequency * HZ_PER_MHZ) > high):
+            return numpy.empty(0, dtype=FREQ_DTYPE), numpy.empty(0, dtype=LEVEL_DTYPE)
+        return source.slice_hz((low, high))
+
+    # Method to replace the merged arrays, changing the data version
+    def _set_data(self, freqs_hz, levels_fixed):
+        self.version += 1
+        freqs_hz.flags.writeable = False
+        levels_fixed.flags.writeable = False
+        self._freqs_hz = freqs_hz
+        self._levels_fixed = levels_fixed
+
+# Function to get start and stop indexes of sorted freqs within (low, high), where high 0 is unlimited
+def span_indexes(freqs, span):
+    start = numpy.searchsorted(freqs, span[0], side='left')
+    stop = len(freqs) if span[1] == 0 else numpy.searchsorted(freqs, span[1], side='right')
+    return start, max(start, stop)
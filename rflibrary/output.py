@@ -1,12 +1,25 @@
 import os
 import datetime
+import concurrent.futures
 from file import File, InvalidFileError
+from channels import channel_index
+from merge import MasterSpectrum, resample_runs
+from waterfall import Waterfall
+from decimate import decimate
+from formats import format_csv, format_wsm
 import settings
 
-class Output:
+# Batches smaller than this are parsed without starting a process pool
+POOL_THRESHOLD = 8
+
+class Output:  # pylint: disable=too-many-public-methods
     def __init__(self, **kwargs):
         # File List
         self.files = []
+        self.cache = kwargs.get('cache')
+        # Files added while only sniffed, mapped to False if removed before they were loaded
+        self._loading = {}
+        self.compact = kwargs.get('compact', False)
 
         # Venue Details
         self.venue = kwargs['venue']
@@ -46,6 +59,17 @@ class Output:
 
         self.low_freq_limit = kwargs['low_freq_limit']
         self.high_freq_limit = kwargs['high_freq_limit']
+        self.master = MasterSpectrum((self.low_freq_limit, self.high_freq_limit))
+        self.waterfall = Waterfall((self.low_freq_limit, self.high_freq_limit))
+
+        # Merge Options, resolution in kHz (0 for finest input resolution)
+        self.merge_mode = kwargs.get('merge_mode', settings.DEFAULT_MERGE_MODE)
+        self.merge_resolution = kwargs.get('merge_resolution', 0)
+        self.merge_percentile = kwargs.get('merge_percentile', 50)
+
+        # Export Decimation, step in kHz (0 to disable either stage)
+        self.export_max_points = kwargs.get('export_max_points', 0)
+        self.export_bucket_width = kwargs.get('export_bucket_width', 0)
 
         self._set_master_filename()
 
@@ -59,8 +83,17 @@ class Output:
 
     def set_country(self, val):
         self.country = val
+        self._update_tv_channels()
         self._update_output()
 
+    # Method to update TV channels of all files with one batched lookup
+    def _update_tv_channels(self):
+        spans = channel_index(self.country).spans(
+            [file.start_frequency for file in self.files],
+            [file.stop_frequency for file in self.files])
+        for file, span in zip(self.files, spans):
+            file.update_tv_channels(self.country, span)
+
     def set_in_out(self, val):
         self.in_out = val
         self._update_output()
@@ -72,21 +105,100 @@ class Output:
         return self.scan_datetimestamp.strftime(self.date_format)
 
     def add_file(self, file, country):
-        new_file = File(file, country)
-        if not new_file.valid:
+        new_file = load_file(file, country, self.cache, self.compact)
+        if new_file is None or not new_file.valid:
             raise InvalidFileError
 
         self.io_guess += new_file.in_out
         self.files.append(new_file)
+        self.master.add(new_file)
+        self.waterfall.add(new_file)
+        self._update_output()
+
+    # Method to add a batch of files, which may already be parsed File objects, parsing the rest in parallel
+    # and returning the names of invalid files. Files only sniffed so far are not merged until loaded.
+    def add_files(self, files, country, workers=None):
+        filenames = [file for file in files if not isinstance(file, File)]
+        workers = min(workers or os.cpu_count() or 1, len(filenames))
+        if workers <= 1 or len(filenames) < POOL_THRESHOLD:
+            parsed_files = [load_file(file, country, self.cache, self.compact) for file in filenames]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed_files = list(executor.map(
+                    load_file,
+                    filenames,
+                    [country] * len(filenames),
+                    [self.cache] * len(filenames),
+                    [self.compact] * len(filenames),
+                    chunksize=max(1, len(filenames) // (workers * 4))))
+        parsed_files = iter(parsed_files)
+        new_files = [file if isinstance(file, File) else next(parsed_files) for file in files]
+
+        invalid_files = []
+        for file, new_file in zip(files, new_files):
+            if new_file is None:
+                invalid_files.append(file)
+            elif new_file.valid:
+                self.io_guess += new_file.in_out
+                self.files.append(new_file)
+                if new_file.loaded:
+                    self.master.add(new_file)
+                    self.waterfall.add(new_file)
+                else:
+                    self._loading[new_file] = True
+            else:
+                invalid_files.append(new_file.full_filename)
+        self._update_output()
+        return invalid_files
+
+    # Method to check if a file was added while only sniffed and has not been passed to load_files yet
+    def is_loading(self, file):
+        return file in self._loading
+
+    # Method to merge files added while only sniffed, loading them if needed, and remove files that turn
+    # out to be invalid, returning them
+    def load_files(self, files):
+        invalid_files = []
+        for file in files:
+            if not self._loading.pop(file, False):
+                continue
+            if file.load():
+                self.master.add(file)
+                self.waterfall.add(file)
+            else:
+                self.io_guess -= file.in_out
+                self.files.remove(file)
+                invalid_files.append(file)
+        if len(invalid_files) > 0:
+            self._update_output()
+        return invalid_files
+
+    # Method to remove files still waiting to be loaded, returning them
+    def remove_loading_files(self):
+        loading = {file for file, added in self._loading.items() if added}
+        self._loading.clear()
+        files = [file for file in self.files if file in loading]
+        self.io_guess -= sum(file.in_out for file in files)
+        self.files[:] = [file for file in self.files if file not in loading]
         self._update_output()
+        return files
 
     def remove_file(self, file):
         self.io_guess -= file.in_out
         self.files.remove(file)
+        if file in self._loading:
+            # Keep waiting for the file so it is not added again once loaded
+            self._loading[file] = False
+        else:
+            self.master.remove(file)
+            self.waterfall.remove(file)
         self._update_output()
 
     def clear_files(self):
         del self.files[:]
+        self._loading.clear()
+        self.master.clear()
+        self.waterfall.clear()
         self.io_fixed = False
         self.io_guess = 0
         self._update_output()
@@ -171,55 +283,43 @@ class Output:
                 self._target_location = self._target_location
         self.scan_output_location = os.path.join(self._library_location, self._target_location)
 
-    def write_output_file(self):
-        output_file = []
-        for file in self.files:
-            for freq, value in file.frequencies:
-                if freq >= self.low_freq_limit and (self.high_freq_limit == 0 or freq <= self.high_freq_limit):
-                    output_file.append([float(freq), float(value)])
-
-        # Remove duplicates
-        output_file = sorted(output_file)
-        i = 1
-        while i < len(output_file):
-            if output_file[i][0] == output_file[i - 1][0]:
-                output_file.remove(output_file[i - 1])
-            else:
-                i += 1
-
-        output_string = ''
-        for freq, value in output_file:
-            output_string += f'{freq:09.4f},{value:09.4f}\n'
-
-        return output_string
-
-    def write_wsm_file(self, title):
-        output_file = []
-        for file in self.files:
-            for freq, value in file.frequencies:
-                if freq >= self.low_freq_limit and (self.high_freq_limit == 0 or freq <= self.high_freq_limit):
-                    output_file.append([float(freq), float(value)])
-
-        # Remove duplicates
-        output_file = sorted(output_file)
-        i = 1
-        while i < len(output_file):
-            if output_file[i][0] == output_file[i - 1][0]:
-                output_file.remove(output_file[i - 1])
-            else:
-                i += 1
-
-        wsm_date = self.scan_datetimestamp.strftime('%Y-%m-%d 00:00:00')
-        output_string = (f'Receiver;{title}\n'
-                         f'Date/Time;{wsm_date}\n'
-                         'RFUnit;dBm\n\n\nFrequency Range [kHz];'
-                         f'{(self.low_freq_limit * 1000):06d};'
-                         f'{self.high_freq_limit * 1000:06d};\n')
-        output_string += 'Frequency;RF level (%);RF level\n'
-        for freq, value in reversed(output_file):
-            output_string += f'{int(freq * 1000):06d};;{value:04.1f}\n'
-
-        return output_string
+    # Method to apply frequency limits, merge and export options changed in settings
+    def apply_settings(self, plist):
+        self.low_freq_limit = plist['low_freq_limit']
+        self.high_freq_limit = plist['high_freq_limit']
+        self.master.set_limits((self.low_freq_limit, self.high_freq_limit))
+        self.waterfall.set_limits((self.low_freq_limit, self.high_freq_limit))
+        self.merge_mode = plist['merge_mode']
+        self.merge_resolution = plist['merge_resolution']
+        self.merge_percentile = plist['merge_percentile']
+        self.export_max_points = plist['export_max_points']
+        self.export_bucket_width = plist['export_bucket_width']
+
+    # Method to get the merged spectrum of all files within frequency limits,
+    # shared by all output formats
+    def merge(self):
+        self.master.set_limits((self.low_freq_limit, self.high_freq_limit))
+        self.waterfall.set_limits((self.low_freq_limit, self.high_freq_limit))
+        mode = merge_modes.get(self.merge_mode)
+        if mode is None:
+            merged = self.master.spectrum
+        else:
+            merged = resample_runs(self.master.runs(), mode, self.merge_resolution / 1000, self.merge_percentile)
+        return decimate(*merged, self.export_max_points, self.export_bucket_width / 1000)
+
+    def write_output_file(self, merged=None):
+        if merged is None:
+            merged = self.merge()
+        return format_csv(*merged)
+
+    def write_wsm_file(self, title, merged=None):
+        if merged is None:
+            merged = self.merge()
+        return format_wsm(
+            *merged,
+            title,
+            self.scan_datetimestamp,
+            (self.low_freq_limit, self.high_freq_limit))
 
     # Helper function to set dateFormat
     def set_date_format(self, date_format):
@@ -227,6 +327,23 @@ class Output:
             return date_formats.get(date_format)
         return date_formats.get(settings.DEFAULT_DATE_FORMAT)
 
+# Function to parse (or if lazy, sniff) a file (in a worker process for batches), returning None if it is
+# malformed
+def load_file(file, country, cache=None, compact=False, lazy=False):
+    try:
+        return File(file, country, cache=cache, compact=compact, lazy=lazy)
+    # A malformed file can fail anywhere in its parser, which must not abandon the rest of a batch
+    except Exception:  # pylint: disable=broad-exception-caught
+        return None
+
+merge_modes = {
+    'Exact': None,
+    'Max Hold': 'max',
+    'Min Hold': 'min',
+    'Average': 'mean',
+    'Percentile': 'percentile'
+}
+
 date_formats = {
     'yyyy-mm-dd': '%Y-%m-%d',
     'yyyy-dd-mm': '%Y-%d-%m',
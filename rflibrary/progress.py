@@ -0,0 +1,53 @@
+from tkinter import ttk
+
+import data
+from tooltip import ToolTip
+
+# Milliseconds between checks for parsed files
+POLL_INTERVAL = 50
+
+# Progress bar with cancel button, hidden until an Ingestion is running. Polls the ingestion from
+# the Tk event loop, passing each batch of results to on_results and calling on_finished at the end.
+class IngestionProgress:
+    def __init__(self, parent, on_results, on_finished):
+        self.ingestion = None
+        self._discard = False
+        self._on_results = on_results
+        self._on_finished = on_finished
+
+        self.frame = ttk.Frame(parent)
+        self.progress_bar = ttk.Progressbar(self.frame, mode='determinate', length=300)
+        self.progress_bar.grid(column=0, row=0, sticky='WE', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        self.cancel_button = ttk.Button(self.frame, text='Cancel', command=self.cancel)
+        self.cancel_button.grid(column=1, row=0, sticky='E', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        ToolTip(self.cancel_button, 'Stop adding files, keeping files already added').bind()
+
+    @property
+    def running(self):
+        return self.ingestion is not None
+
+    def start(self, ingestion):
+        self.ingestion = ingestion
+        self._discard = False
+        self.progress_bar.configure(maximum=ingestion.total, value=0)
+        self.frame.grid()
+        ingestion.start()
+        self.frame.after(POLL_INTERVAL, self._poll)
+
+    # Method to stop the ingestion, discarding files not yet passed to on_results if discard is set
+    def cancel(self, discard=False):
+        if self.ingestion is not None:
+            self.ingestion.cancel()
+            self._discard = self._discard or discard
+
+    def _poll(self):
+        results = self.ingestion.results()
+        if len(results) > 0 and not self._discard:
+            self._on_results(results)
+        self.progress_bar.configure(value=self.ingestion.completed)
+        if not self.ingestion.finished:
+            self.frame.after(POLL_INTERVAL, self._poll)
+            return
+        self.frame.grid_remove()
+        self.ingestion = None
+        self._on_finished()
@@ -6,6 +6,7 @@ import data
 DEFAULT_DIRECTORY_STRUCTURE = os.path.join('%c', '%t %v', '%y')
 DEFAULT_FILENAME_STRUCTURE = '%t %c-%v-%y%m%d-%i %f %n'
 DEFAULT_DATE_FORMAT = 'yyyy-mm-dd'
+DEFAULT_MERGE_MODE = 'Exact'
 
 # Load settings plist if it exists yet
 errors_to_display = []
@@ -48,6 +49,12 @@ def set_plist_defaults(settings):
         'default_date_format',
         'low_freq_limit',
         'high_freq_limit',
+        'merge_mode',
+        'merge_resolution',
+        'merge_percentile',
+        'export_max_points',
+        'export_bucket_width',
+        'write_sidecars',
         'defaultVenue',
         'defaultTown',
         'defaultCountry',
@@ -67,6 +74,12 @@ def set_plist_defaults(settings):
         DEFAULT_DATE_FORMAT,
         0,
         0,
+        DEFAULT_MERGE_MODE,
+        0,
+        50,
+        0,
+        0,
+        False,
         'Venue',
         'Town',
         'United Kingdom',
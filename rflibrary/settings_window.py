@@ -10,7 +10,7 @@ import tkinter.filedialog as tkfiledialog
 # Program data and module imports
 import data
 from tooltip import ToolTip
-from output import date_formats
+from output import date_formats, merge_modes
 import log
 from helpers import dir_format
 import settings
@@ -67,6 +67,12 @@ class SettingsWindow:
         self._file_structure = tk.StringVar(value=settings.plist['file_structure'])
         self._low_freq_limit = tk.StringVar(value=settings.plist['low_freq_limit'])
         self._high_freq_limit = tk.StringVar(value=settings.plist['high_freq_limit'])
+        self._merge_mode = tk.StringVar(value=settings.plist['merge_mode'])
+        self._merge_resolution = tk.StringVar(value=settings.plist['merge_resolution'])
+        self._merge_percentile = tk.StringVar(value=settings.plist['merge_percentile'])
+        self._export_max_points = tk.StringVar(value=settings.plist['export_max_points'])
+        self._export_bucket_width = tk.StringVar(value=settings.plist['export_bucket_width'])
+        self._write_sidecars = tk.BooleanVar(value=settings.plist['write_sidecars'])
         self._default_date_format = tk.StringVar(value=settings.plist['default_date_format'])
         self._create_log = tk.BooleanVar(value=settings.plist['create_log'])
         self._log_folder_display = tk.StringVar(value=dir_format(settings.plist['logFolder'], 50))
@@ -120,6 +126,8 @@ class SettingsWindow:
         high_freq_limit = self._create_op_prefs_entry('High Frequency Limit', self._high_freq_limit, 6)
         ToolTip(high_freq_limit, 'High frequency limit for the output file (set to 0 for no limit)').bind()
 
+        self._create_merge_widgets()
+
         # Create Log
         ttk.Label(
             self._logging_preferences,
@@ -167,6 +175,42 @@ class SettingsWindow:
         self._settings_window.bind_all('<Return>', self._save_settings)
         self._settings_window.bind_all('<Escape>', self._close_settings)
 
+    # Create merge, decimation and binary output widgets
+    def _create_merge_widgets(self):
+        # Merge Options
+        ttk.Label(
+            self._output_preferences,
+            text='Merge Mode',
+            width='16'
+        ).grid(column=0, row=7, sticky='W', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        merge_mode_box = ttk.Combobox(self._output_preferences, textvariable=self._merge_mode, state='readonly')
+        merge_mode_box['values'] = list(merge_modes)
+        merge_mode_box.grid(column=1, row=7, sticky='W', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        ToolTip(merge_mode_box, 'How overlapping scans are combined into the master file').bind()
+
+        merge_resolution = self._create_op_prefs_entry('Merge Resolution', self._merge_resolution, 8)
+        ToolTip(merge_resolution, 'Master file resolution in kHz (set to 0 for finest scan resolution)').bind()
+
+        merge_percentile = self._create_op_prefs_entry('Merge Percentile', self._merge_percentile, 9)
+        ToolTip(merge_percentile, 'Percentile used by the Percentile merge mode').bind()
+
+        # Export Decimation
+        export_max_points = self._create_op_prefs_entry('Export Max Points', self._export_max_points, 11)
+        ToolTip(export_max_points, 'Maximum points in the master file, keeping peaks (set to 0 for all points)').bind()
+
+        export_bucket_width = self._create_op_prefs_entry('Export Step', self._export_bucket_width, 12)
+        ToolTip(export_bucket_width, 'Keep the highest and lowest points per kHz step (0 for all points)').bind()
+
+        # Binary Sidecars
+        ttk.Label(
+            self._output_preferences,
+            text='Write Binary Files',
+            width='16'
+        ).grid(column=0, row=10, sticky='W', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        write_sidecars_check = ttk.Checkbutton(self._output_preferences, variable=self._write_sidecars)
+        write_sidecars_check.grid(column=1, row=10, sticky='W', padx=data.PAD_X_DEFAULT, pady=data.PAD_Y_DEFAULT)
+        ToolTip(write_sidecars_check, 'Write a binary .rfl file next to each output file for fast reopening').bind()
+
     def _create_op_prefs_entry(self, label, var, row, width='20'):
         ttk.Label(
             self._output_preferences,
@@ -234,6 +278,16 @@ class SettingsWindow:
                     var.set(default)
             if int(var.get()) < 0:
                 var.set(0)
+        for var, default, maximum in [
+                (self._merge_resolution, settings.plist['merge_resolution'], None),
+                (self._merge_percentile, settings.plist['merge_percentile'], 100),
+                (self._export_max_points, settings.plist['export_max_points'], None),
+                (self._export_bucket_width, settings.plist['export_bucket_width'], None)]:
+            try:
+                value = max(int(var.get()), 0)
+            except ValueError:
+                value = default
+            var.set(value if maximum is None else min(value, maximum))
         if int(self._low_freq_limit.get()) > int(self._high_freq_limit.get()):
             self._low_freq_limit.set(self._high_freq_limit.get())
         elif int(self._high_freq_limit.get()) < int(self._low_freq_limit.get()):
@@ -247,6 +301,12 @@ class SettingsWindow:
         settings.plist['default_date_format'] = self._default_date_format.get()
         settings.plist['low_freq_limit'] = int(self._low_freq_limit.get())
         settings.plist['high_freq_limit'] = int(self._high_freq_limit.get())
+        settings.plist['merge_mode'] = self._merge_mode.get()
+        settings.plist['merge_resolution'] = int(self._merge_resolution.get())
+        settings.plist['merge_percentile'] = int(self._merge_percentile.get())
+        settings.plist['export_max_points'] = int(self._export_max_points.get())
+        settings.plist['export_bucket_width'] = int(self._export_bucket_width.get())
+        settings.plist['write_sidecars'] = self._write_sidecars.get()
         settings.plist['create_log'] = self._create_log.get()
         settings.plist['logFolder'] = self._log_folder
         settings.plist['auto_update_check'] = self._auto_update_check.get()
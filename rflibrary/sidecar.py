@@ -0,0 +1,70 @@
+import os
+import json
+import struct
+import numpy
+from units import FREQ_DTYPE, LEVEL_DTYPE
+
+# Binary scan files hold a fixed header, JSON metadata, then the frequency (integer Hz)
+# and level (fixed point) arrays, each aligned so they can be memory mapped in place
+EXTENSION = '.rfl'
+MAGIC = b'RFLIBRY\0'
+VERSION = 2
+HEADER = struct.Struct('<8sHxxIQ')
+ALIGNMENT = 8
+
+class InvalidSidecarError(Exception):
+    "Invalid sidecar file"
+
+# Function to get the sidecar filename for a scan file, keeping its extension so scans with the
+# same name in different formats have different sidecars
+def sidecar_filename(filename):
+    if os.path.splitext(filename)[1].lower() == EXTENSION:
+        return filename
+    return filename + EXTENSION
+
+# Function to check if a scan file has a sidecar at least as new as itself
+def has_fresh_sidecar(filename):
+    try:
+        return os.path.getmtime(sidecar_filename(filename)) >= os.path.getmtime(filename)
+    except OSError:
+        return False
+
+# Function to write integer arrays and JSON serialisable metadata to a sidecar
+def write_sidecar(filename, freqs_hz, levels_fixed, metadata):
+    metadata = json.dumps(metadata).encode('utf-8')
+    metadata += b' ' * (-(HEADER.size + len(metadata)) % ALIGNMENT)
+    temp_filename = f'{filename}.{os.getpid()}.tmp'
+    with open(temp_filename, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(metadata), len(freqs_hz)))
+        file.write(metadata)
+        file.write(numpy.ascontiguousarray(freqs_hz, dtype=FREQ_DTYPE).tobytes())
+        file.write(numpy.ascontiguousarray(levels_fixed, dtype=LEVEL_DTYPE).tobytes())
+    os.replace(temp_filename, filename)
+
+# Function to open a sidecar, returning read-only memory mapped arrays and metadata
+def read_sidecar(filename):
+    with open(filename, 'rb') as file:
+        header = file.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise InvalidSidecarError
+        magic, version, metadata_size, num_points = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise InvalidSidecarError
+        try:
+            metadata = json.loads(file.read(metadata_size).decode('utf-8'))
+        except ValueError as error:
+            raise InvalidSidecarError from error
+
+    freqs_offset = HEADER.size + metadata_size
+    levels_offset = freqs_offset + num_points * FREQ_DTYPE.itemsize
+    if os.path.getsize(filename) < levels_offset + num_points * LEVEL_DTYPE.itemsize:
+        raise InvalidSidecarError
+    if num_points == 0:
+        freqs_hz = numpy.empty(0, dtype=FREQ_DTYPE)
+        levels_fixed = numpy.empty(0, dtype=LEVEL_DTYPE)
+        freqs_hz.flags.writeable = False
+        levels_fixed.flags.writeable = False
+        return freqs_hz, levels_fixed, metadata
+    freqs_hz = numpy.memmap(filename, dtype=FREQ_DTYPE, mode='r', offset=freqs_offset, shape=(num_points,))
+    levels_fixed = numpy.memmap(filename, dtype=LEVEL_DTYPE, mode='r', offset=levels_offset, shape=(num_points,))
+    return freqs_hz, levels_fixed, metadata
@@ -0,0 +1,90 @@
+import numpy
+
+# Frequencies are stored as integer Hz and levels as integer multiples of 1/LEVEL_SCALE dB,
+# so comparison, dedupe and range filtering are exact
+HZ_PER_MHZ = 1000000
+LEVEL_SCALE = 1000000
+
+# Fixed point steps per 1e-4 dB, the resolution levels are written to output files with
+LEVEL_FORMAT_STEP = LEVEL_SCALE // 10000
+FREQ_DTYPE = numpy.dtype(numpy.int64)
+LEVEL_DTYPE = numpy.dtype(numpy.int32)
+
+# Function to convert frequencies in MHz to integer Hz
+def to_hz(freqs):
+    freqs = numpy.array(freqs, dtype=numpy.float64)
+    freqs *= HZ_PER_MHZ
+    return numpy.rint(freqs, out=freqs).astype(FREQ_DTYPE)
+
+# Function to convert integer Hz to frequencies in MHz
+def from_hz(freqs_hz, dtype=numpy.float64):
+    return (numpy.asarray(freqs_hz) / HZ_PER_MHZ).astype(dtype, copy=False)
+
+# Function to convert levels in dB to fixed point, where levels rounded to exactly halfway between
+# output steps are moved one step back towards the level, so they are written as the level would be
+def to_fixed(levels):
+    levels = numpy.array(levels, dtype=numpy.float64)
+    fixed = numpy.rint(levels * LEVEL_SCALE)
+    ties = numpy.flatnonzero(fixed % LEVEL_FORMAT_STEP == LEVEL_FORMAT_STEP // 2)
+    if len(ties) > 0:
+        fixed[ties] += scaled_residual_sign(levels[ties], fixed[ties])
+    return fixed.astype(LEVEL_DTYPE)
+
+# Function to get the exact sign of levels * LEVEL_SCALE - fixed, splitting levels into halves
+# so that each product with LEVEL_SCALE (which fits in 26 bits) is exact
+def scaled_residual_sign(levels, fixed):
+    split = levels * 134217729.0
+    high = split - (split - levels)
+    low = levels - high
+    product = levels * LEVEL_SCALE
+    error = (high * LEVEL_SCALE - product) + low * LEVEL_SCALE
+    return numpy.sign((product - fixed) + error)
+
+# Function to convert fixed point levels to dB
+def from_fixed(levels_fixed, dtype=numpy.float64):
+    return (numpy.asarray(levels_fixed) / LEVEL_SCALE).astype(dtype, copy=False)
+
+# Compact storage holds frequencies as int32 Hz offsets from the lowest frequency and levels
+# as int16 centi-dB, each only where every value fits exactly
+COMPACT_FREQ_DTYPE = numpy.dtype(numpy.int32)
+COMPACT_LEVEL_DTYPE = numpy.dtype(numpy.int16)
+COMPACT_LEVEL_STEP = LEVEL_SCALE // 100
+
+# Function to compact sorted integer Hz, returning (base, offsets), or (0, freqs_hz) if the span is too wide
+def compact_freqs(freqs_hz):
+    if len(freqs_hz) == 0 or freqs_hz[-1] - freqs_hz[0] > numpy.iinfo(COMPACT_FREQ_DTYPE).max:
+        return 0, freqs_hz
+    base = int(freqs_hz[0])
+    offsets = (freqs_hz - base).astype(COMPACT_FREQ_DTYPE)
+    offsets.flags.writeable = False
+    return base, offsets
+
+# Function to compact fixed point levels, returning (step, levels) with step 1 if not exact in centi-dB
+def compact_levels(levels_fixed):
+    limits = numpy.iinfo(COMPACT_LEVEL_DTYPE)
+    if (len(levels_fixed) == 0
+            or numpy.any(levels_fixed % COMPACT_LEVEL_STEP)
+            or levels_fixed.min() < limits.min * COMPACT_LEVEL_STEP
+            or levels_fixed.max() > limits.max * COMPACT_LEVEL_STEP):
+        return 1, levels_fixed
+    levels = (levels_fixed // COMPACT_LEVEL_STEP).astype(COMPACT_LEVEL_DTYPE)
+    levels.flags.writeable = False
+    return COMPACT_LEVEL_STEP, levels
+
+# Function to expand compacted frequencies to integer Hz
+def expand_freqs(base, freqs):
+    if freqs.dtype == FREQ_DTYPE:
+        return freqs
+    freqs_hz = freqs.astype(FREQ_DTYPE)
+    freqs_hz += base
+    freqs_hz.flags.writeable = False
+    return freqs_hz
+
+# Function to expand compacted levels to fixed point
+def expand_levels(step, levels):
+    if levels.dtype == LEVEL_DTYPE:
+        return levels
+    levels_fixed = levels.astype(LEVEL_DTYPE)
+    levels_fixed *= step
+    levels_fixed.flags.writeable = False
+    return levels_fixed
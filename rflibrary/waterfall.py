@@ -0,0 +1,102 @@
+import numpy
+
+from units import HZ_PER_MHZ, to_hz, from_fixed
+
+DEFAULT_COLUMNS = 256
+
+# Grid of levels (dBm) of a set of sources (objects like File with start_frequency, stop_frequency,
+# creation_date and slice_hz) over time, each reduced to its highest level in each frequency column
+# so narrow carriers are kept. Rows are only computed for sources added since the grid was last read,
+# unless the frequency span of all sources changes.
+class Waterfall:
+    def __init__(self, limits=(0, 0), columns=DEFAULT_COLUMNS):
+        self.limits = None
+        self.columns = columns
+        self._sources = []
+        self._rows = []
+        self._pending = []
+        self._span = None
+        self.set_limits(limits)
+
+    def __len__(self):
+        return len(self._sources) + len(self._pending)
+
+    # Frequency span (MHz) of grid columns, or None if there are no sources
+    @property
+    def span(self):
+        self._flush()
+        return self._span
+
+    # Rows of levels ordered from oldest to newest source, NaN where a source has no data
+    @property
+    def grid(self):
+        self._flush()
+        if len(self._rows) == 0:
+            return numpy.empty((0, self.columns), dtype=numpy.float32)
+        order = sorted(range(len(self._sources)), key=lambda index: self._sources[index].creation_date)
+        return numpy.vstack([self._rows[index] for index in order])
+
+    # Method to queue a source, added to the grid when next read
+    def add(self, source):
+        self._pending.append(source)
+
+    def remove(self, source):
+        self._pending = [other for other in self._pending if other is not source]
+        for index, other in enumerate(self._sources):
+            if other is source:
+                del self._sources[index]
+                del self._rows[index]
+                return
+
+    def clear(self):
+        del self._sources[:]
+        del self._rows[:]
+        del self._pending[:]
+        self._span = None
+
+    # Method to change frequency limits (MHz), recomputing rows when next read if they differ
+    def set_limits(self, limits):
+        if self.limits is not None and tuple(limits) == tuple(self.limits):
+            return
+        self.limits = limits
+        self._span = None
+
+    # Method to compute rows of pending sources, or of all sources if the span has changed
+    def _flush(self):
+        span = self._get_span(self._sources + self._pending)
+        if span != self._span:
+            self._pending = self._sources + self._pending
+            self._sources = []
+            self._rows = []
+            self._span = span
+        if len(self._pending) == 0:
+            return
+        self._rows += [self._row(source) for source in self._pending]
+        self._sources += self._pending
+        self._pending = []
+
+    # Method to get the frequency span (MHz) of sources within limits, where a high limit of 0 is unlimited
+    def _get_span(self, sources):
+        if len(sources) == 0:
+            return None
+        low = max(self.limits[0], min(source.start_frequency for source in sources))
+        high = max(source.stop_frequency for source in sources)
+        if self.limits[1] != 0:
+            high = min(self.limits[1], high)
+        return (low, high) if high > low else None
+
+    # Method to get the highest level (dBm) of a source in each column of the span
+    def _row(self, source):
+        row = numpy.full(self.columns, numpy.nan, dtype=numpy.float32)
+        if self._span is None:
+            return row
+        low, high = (int(value) for value in to_hz(self._span))
+        if round(source.stop_frequency * HZ_PER_MHZ) < low or round(source.start_frequency * HZ_PER_MHZ) > high:
+            return row
+        freqs_hz, levels_fixed = source.slice_hz((low, high))
+        if len(freqs_hz) == 0:
+            return row
+        columns = numpy.minimum((freqs_hz - low) * self.columns // (high - low), self.columns - 1)
+        starts = numpy.flatnonzero(numpy.concatenate(([True], columns[1:] != columns[:-1])))
+        row[columns[starts]] = from_fixed(numpy.maximum.reduceat(levels_fixed, starts), numpy.float32)
+        return row
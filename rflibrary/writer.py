@@ -1,5 +1,7 @@
 import os
 import data
+from formats import csv_chunks, wsm_chunks
+from sidecar import write_sidecar
 
 class Writer:
     def get_filename(self, directory, filename):
@@ -20,30 +22,30 @@ class Writer:
     def create_directory(self, location):
         os.makedirs(location)
 
-    # Method to write file to disk
-    def write_file(self, filename, string):
+    # Method to write file to disk from a string or an iterable of string chunks
+    def write_file(self, filename, contents):
         try:
             with open(filename, 'w', encoding='UTF-8') as file:
-                file.write(string)
+                if isinstance(contents, str):
+                    file.write(contents)
+                else:
+                    file.writelines(contents)
             return True
         except IOError:
             return False
 
-    # Method to write file to disk
-    def write_file_from_list(self, filename, array):
-        with open(filename, 'w', encoding='UTF-8') as file:
-            for freq, value in array:
-                file.write(f'{freq:09.4f},{value:09.4f}\n')
+    # Method to write (freqs, levels) spectrum to disk as CSV
+    def write_csv_file(self, filename, spectrum):
+        return self.write_file(filename, csv_chunks(*spectrum))
 
-    # Method to write WSM file to disk
-    def write_wsm_file(self, filename, array, wsm_date, limits):
-        with open(filename, 'w', encoding='UTF-8') as file:
-            wsm_date = wsm_date.strftime('%Y-%m-%d 00:00:00')
-            file.write(f'Receiver;{data.TITLE}\n'
-                       f'Date/Time;{wsm_date}\n'
-                       'RFUnit;dBm\n\n\nFrequency Range [kHz];'
-                       f'{(limits[0] * 1000):06d};'
-                       f'{limits[1] * 1000:06d};\n')
-            file.write('Frequency;RF level (%);RF level\n')
-            for freq, value in reversed(array):
-                file.write(f'{int(freq * 1000):06d};;{value:04.1f}\n')
+    # Method to write (freqs, levels) spectrum to disk as WSM file
+    def write_wsm_file(self, filename, spectrum, wsm_date, limits):
+        return self.write_file(filename, wsm_chunks(*spectrum, data.TITLE, wsm_date, limits))
+
+    # Method to write (freqs_hz, levels_fixed) spectrum and metadata dictionary to disk as binary sidecar
+    def write_sidecar_file(self, filename, spectrum_fixed, metadata):
+        try:
+            write_sidecar(filename, *spectrum_fixed, metadata)
+            return True
+        except (IOError, TypeError, ValueError):
+            return False
@@ -0,0 +1,59 @@
+import unittest
+import os
+import pathlib
+import shutil
+import tempfile
+
+from cache import ParseCache
+from file import File
+
+data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
+
+class TestParseCache(unittest.TestCase):
+    def test(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ParseCache(os.path.join(directory, 'cache'))
+            for filename in ['IN_001.csv', 'RFExplorer_SingleSweepData_2016_05_28_16_57_56.csv', 'Shure ULXD.sdb2']:
+                source = os.path.join(directory, filename)
+                shutil.copyfile(os.path.join(data_directory, filename), source)
+
+                self.assertIsNone(cache.get(source), f'Expected {filename} not to be cached')
+                uncached = File(source, 'United Kingdom', cache=cache)
+                cached = cache.get(source)
+                self.assertIsNotNone(cached, f'Expected {filename} to be cached')
+                self.assertEqual(list(cached['freqs_hz']), list(uncached.freqs_hz))
+                self.assertEqual(list(cached['levels_fixed']), list(uncached.levels_fixed))
+
+                fut = File(source, 'United Kingdom', cache=cache)
+                self.assertEqual(fut.model, uncached.model)
+                self.assertEqual(fut.creation_date, uncached.creation_date)
+                self.assertEqual(fut.data_points, uncached.data_points)
+                self.assertEqual(list(fut.levels), list(uncached.levels))
+
+            # Changing a file invalidates its entry
+            source = os.path.join(directory, 'IN_001.csv')
+            with open(source, 'a', encoding='utf-8') as file:
+                file.write('0088.1260,-050.0\n')
+            self.assertIsNone(cache.get(source))
+            self.assertEqual(File(source, 'United Kingdom', cache=cache).data_points, 272)
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ParseCache(os.path.join(directory, 'cache'))
+            source = os.path.join(data_directory, 'IN_001.csv')
+            File(source, 'United Kingdom', cache=cache)
+            entry_size = cache._total_size()
+
+            # Least recently used entries are evicted once the size limit is reached
+            cache.size_limit = entry_size * 2
+            sources = []
+            for i in range(3):
+                sources.append(os.path.join(directory, f'IN_00{i}.csv'))
+                shutil.copyfile(source, sources[-1])
+                os.utime(sources[-1], ns=(i * 10 ** 9, i * 10 ** 9))
+                File(sources[-1], 'United Kingdom', cache=cache)
+            self.assertLessEqual(cache._total_size(), cache.size_limit)
+            self.assertIsNotNone(cache.get(sources[-1]))
+
+            cache.clear()
+            self.assertIsNone(cache.get(sources[-1]))
@@ -0,0 +1,60 @@
+import unittest
+import random
+
+from channels import channel_index, TV_CHANNELS
+
+class TestChannelIndex(unittest.TestCase):
+    def test(self):
+        tests = [{
+            'country': 'United States of America',
+            'start': 54,
+            'stop': 88,
+            'expected_span': (2, 6)
+        }, {
+            'country': 'United States of America',
+            'start': 600,
+            'stop': 659.464,
+            'expected_span': (35, 45)
+        }, {
+            'country': 'United Kingdom',
+            'start': 632.125,
+            'stop': 695.875,
+            'expected_span': (41, 49)
+        }, {
+            'country': 'United Kingdom',
+            'start': 470.5,
+            'stop': 477,
+            'expected_span': (21, 21)
+        }, {
+            'country': 'United Kingdom',
+            'start': 100,
+            'stop': 500,
+            'expected_span': (None, None)
+        }, {
+            'country': 'United Kingdom',
+            'start': 600,
+            'stop': 1000,
+            'expected_span': (37, None)
+        }]
+
+        for test in tests:
+            span = channel_index(test['country']).span(test['start'], test['stop'])
+            self.assertEqual(
+                span,
+                test['expected_span'],
+                (f'Expected {test["start"]}-{test["stop"]}MHz span to equal {test["expected_span"]}, '
+                 f'got {span}'))
+            self.assertEqual(channel_index(test['country']).spans([test['start']], [test['stop']]), [span])
+
+    def test_batch(self):
+        for country, channels in TV_CHANNELS.items():
+            index = channel_index(country)
+            starts = [random.uniform(40, 900) for _ in range(500)] + [channel[1] for channel in channels]
+            stops = [start + random.uniform(0, 200) for start in starts]
+            stops[-len(channels):] = [channel[2] for channel in channels]
+
+            # Batched lookups match single lookups, which match a linear search
+            self.assertEqual(index.spans(starts, stops), [index.span(*span) for span in zip(starts, stops)])
+            for start in starts:
+                expected = next((channel[0] for channel in channels if channel[1] <= start < channel[2]), None)
+                self.assertEqual(index.channel(start), expected)
@@ -0,0 +1,133 @@
+import unittest
+import os
+import pathlib
+import tempfile
+
+import numpy
+
+from chart import ChartRenderer, file_data, plot_arrays
+from file import File
+from merge import MasterSpectrum
+
+data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
+
+class TestPlotArrays(unittest.TestCase):
+    def test(self):
+        tests = [{
+            'freqs': [470.0, 470.1, 470.2, 471.0, 471.1, 475.0],
+            'levels': [-100.0, -90.0, -95.0, -80.0, -85.0, -70.0],
+            'resolution': 0.1,
+            'expected_freqs': [470.0, 470.1, 470.2, 470.3, 470.9, 471.0, 471.1, 471.2, 474.9, 475.0],
+            'expected_levels': [-100.0, -90.0, -95.0, -200, -200, -80.0, -85.0, -200, -200, -70.0]
+        }, {
+            'freqs': [470.0, 470.1, 470.3],
+            'levels': [-100.0, -90.0, -95.0],
+            'resolution': 0.1,
+            'expected_freqs': [470.0, 470.1, 470.3],
+            'expected_levels': [-100.0, -90.0, -95.0]
+        }, {
+            'freqs': [470.0],
+            'levels': [-100.0],
+            'resolution': 0,
+            'expected_freqs': [470.0],
+            'expected_levels': [-100.0]
+        }]
+
+        for test in tests:
+            freqs, levels = plot_arrays(numpy.array(test['freqs']), numpy.array(test['levels']), test['resolution'])
+            self.assertTrue(numpy.allclose(freqs, test['expected_freqs']), freqs)
+            self.assertTrue(numpy.array_equal(levels, test['expected_levels']), levels)
+
+# Function to get a ChartRenderer request as made by Chart.update
+def render_request(file):
+    return ('scan', file, file_data(file), 'United Kingdom')
+
+class TestChartRenderer(unittest.TestCase):
+    def test(self):
+        renderer = ChartRenderer()
+        empty_size, empty_rgba = renderer.render(None)
+        self.assertEqual(empty_size, (320, 265))
+        self.assertEqual(len(empty_rgba), 320 * 265 * 4)
+
+        files = [File(os.path.join(data_directory, filename), 'United Kingdom')
+                 for filename in ['IN_001.csv', 'IN_002.csv']]
+        frames = []
+        for file in files + files:
+            size, rgba = renderer.render(render_request(file))
+            self.assertEqual(size, empty_size)
+            self.assertEqual(renderer.x_values[0], file.freqs[0])
+            self.assertEqual(renderer.x_values[-1], file.freqs[-1])
+            frames.append(rgba)
+
+        # Redrawing a file gives the same frame
+        self.assertNotEqual(frames[0], empty_rgba)
+        self.assertNotEqual(frames[0], frames[1])
+        self.assertEqual(frames[0], frames[2])
+        self.assertEqual(frames[1], frames[3])
+        self.assertEqual(renderer.render(render_request(files[1]))[1], frames[3])
+        self.assertEqual(renderer.render(None)[1], empty_rgba)
+
+    def test_background(self):
+        renderer = ChartRenderer()
+        renderer.render(None)
+        size, rgba = renderer.render(render_request(File(os.path.join(data_directory, 'IN_001.csv'), 'United Kingdom')))
+
+        # Scan is drawn on white, not the grey of the cleared chart
+        pixels = numpy.frombuffer(rgba, dtype=numpy.uint8).reshape(size[1], size[0], 4)
+        left, bottom, right, top = renderer.axis.get_window_extent().extents.astype(int)
+        axes_pixels = pixels[size[1] - top + 1:size[1] - bottom - 1, left + 1:right - 1, :3].reshape(-1, 3)
+        colours, counts = numpy.unique(axes_pixels, axis=0, return_counts=True)
+        self.assertEqual(tuple(colours[counts.argmax()]), (255, 255, 255))
+
+    def test_cache(self):
+        renderer = ChartRenderer()
+        compact = File(os.path.join(data_directory, 'IN_001.csv'), 'United Kingdom', compact=True)
+        master = MasterSpectrum()
+        master.add(File(os.path.join(data_directory, 'IN_002.csv'), 'United Kingdom'))
+        for file in [compact, master]:
+            renderer.render(render_request(file))
+            cached = renderer._plot_cache[file]
+            renderer.render(render_request(file))
+            self.assertIs(renderer._plot_cache[file], cached)
+
+        # Changing master data replaces its cached plot
+        master.add(compact)
+        renderer.render(render_request(master))
+        self.assertIsNot(renderer._plot_cache[master], cached)
+        self.assertEqual(renderer.x_values[0], compact.freqs[0])
+
+    def test_floor(self):
+        # Scan entirely at or below the level floor
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'IN_FLOOR.csv')
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.writelines(f'{470 + i * 0.025:.3f},-{120 + i % 10}.0\n' for i in range(100))
+            fut = File(filename, 'United Kingdom')
+        renderer = ChartRenderer()
+        renderer.render(render_request(fut))
+        self.assertEqual(renderer.axis.get_ylim(), (-125, -80))
+
+    def test_views(self):
+        renderer = ChartRenderer()
+        files = [File(os.path.join(data_directory, filename), 'United Kingdom')
+                 for filename in ['IN_001.csv', 'IN_002.csv', 'IN_003.csv']]
+        scan_rgba = renderer.render(render_request(files[0]))[1]
+
+        # Overlay spans all files
+        sources = [(file, file_data(file)) for file in files]
+        overlay_rgba = renderer.render(('overlay', sources, sources[0], 'United Kingdom'))[1]
+        self.assertEqual(renderer.axis.get_xlim(), (min(file.freqs[0] for file in files),
+                                                    max(file.freqs[-1] for file in files)))
+        self.assertNotEqual(overlay_rgba, scan_rgba)
+
+        waterfall_rgba = renderer.render(
+            ('waterfall', numpy.array([[-100, numpy.nan], [-90, -50]]), (470, 480), 'United Kingdom'))[1]
+        self.assertEqual(renderer.axis.get_xlim(), (470, 480))
+        self.assertEqual(renderer.axis.get_ylim(), (2, 0))
+        self.assertNotEqual(waterfall_rgba, overlay_rgba)
+
+        # Scan view is unchanged after other views
+        self.assertEqual(renderer.render(render_request(files[0]))[1], scan_rgba)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy
+
+from decimate import decimate, envelope
+
+class TestDecimate(unittest.TestCase):
+    def setUp(self):
+        rng = numpy.random.default_rng(1)
+        self.freqs = 470 + numpy.arange(100000) * 0.001
+        self.levels = rng.uniform(-110, -90, len(self.freqs)).round(1)
+
+        # Narrow carriers which must survive decimation
+        self.carriers = [1234, 50000, 99998]
+        self.levels[self.carriers] = [-20.0, -35.5, -41.0]
+
+    def test_max_points(self):
+        for max_points in [2, 11, 1000, 25000]:
+            freqs, levels = decimate(self.freqs, self.levels, max_points)
+            self.assertLessEqual(len(freqs), max_points)
+            self.assertTrue(numpy.all(freqs[1:] > freqs[:-1]))
+            self.assertEqual(levels.max(), self.levels.max())
+            self.assertEqual(levels.min(), self.levels.min())
+            if max_points >= 1000:
+                for carrier in self.carriers:
+                    self.assertIn(self.freqs[carrier], freqs)
+
+    def test_bucket_width(self):
+        freqs, levels = decimate(self.freqs, self.levels, 0, 0.1)
+        self.assertLessEqual(len(freqs), 2 * 1000)
+        for carrier in self.carriers:
+            index = numpy.flatnonzero(freqs == self.freqs[carrier])
+            self.assertEqual(len(index), 1)
+            self.assertEqual(levels[index[0]], self.levels[carrier])
+
+        # Each bucket keeps its own extremes
+        buckets = numpy.floor((self.freqs - self.freqs[0]) / 0.1)
+        kept_buckets = numpy.floor((freqs - self.freqs[0]) / 0.1)
+        for bucket in [0, 500, 999]:
+            self.assertEqual(levels[kept_buckets == bucket].max(), self.levels[buckets == bucket].max())
+            self.assertEqual(levels[kept_buckets == bucket].min(), self.levels[buckets == bucket].min())
+
+    def test_unchanged(self):
+        for max_points, bucket_width in [(0, 0), (100000, 0), (1, 0), (0, 0.0001)]:
+            freqs, levels = decimate(self.freqs, self.levels, max_points, bucket_width)
+            self.assertTrue(numpy.array_equal(freqs, self.freqs))
+            self.assertTrue(numpy.array_equal(levels, self.levels))
+        freqs, levels = decimate(numpy.empty(0), numpy.empty(0), 10, 0.1)
+        self.assertEqual(len(freqs), 0)
+
+class TestEnvelope(unittest.TestCase):
+    def test(self):
+        rng = numpy.random.default_rng(2)
+        freqs = 470 + numpy.arange(200000) * 0.0005
+        levels = rng.uniform(-110, -90, len(freqs)).round(1)
+        for num_columns in [1, 320, 1280]:
+            reduced_freqs, reduced_levels = envelope(freqs, levels, num_columns)
+            self.assertLessEqual(len(reduced_freqs), 4 * (num_columns + 1))
+            self.assertEqual((reduced_freqs[0], reduced_freqs[-1]), (freqs[0], freqs[-1]))
+
+            # Each column keeps its extremes and end points
+            columns = numpy.floor((freqs - freqs[0]) * (num_columns / (freqs[-1] - freqs[0])))
+            reduced_columns = numpy.floor((reduced_freqs - freqs[0]) * (num_columns / (freqs[-1] - freqs[0])))
+            for column in [0, num_columns // 2, num_columns - 1]:
+                self.assertEqual(reduced_levels[reduced_columns == column].max(), levels[columns == column].max())
+                self.assertEqual(reduced_levels[reduced_columns == column].min(), levels[columns == column].min())
+                self.assertEqual(reduced_freqs[reduced_columns == column][[0, -1]].tolist(),
+                                 freqs[columns == column][[0, -1]].tolist())
+
+        # Short scans are unchanged
+        reduced_freqs, _ = envelope(freqs[:100], levels[:100], 320)
+        self.assertEqual(len(reduced_freqs), 100)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import datetime
+import random
+import itertools
+
+from file_list import FileOrder, COLUMNS
+
+NUMBERS = itertools.count()
+
+# In-memory file with the File details shown in the file list
+class ListedFile:
+    def __init__(self):
+        self.number = next(NUMBERS)
+        self.filename = f'Scan {self.number:04}.csv'
+        self.creation_date = datetime.datetime(2023, 8, 1) + datetime.timedelta(days=random.randint(0, 100))
+        self.model = random.choice(['RF Explorer', 'Shure ULXD', 'WSM'])
+        self.start_frequency = random.choice([470.0, 606.0, 174.0])
+        self.stop_frequency = self.start_frequency + 100
+        self.start_tv_channel = random.choice([None, 21, 38])
+        self.stop_tv_channel = None if self.start_tv_channel is None else self.start_tv_channel + 10
+
+    def date_format(self, date_format):
+        return self.creation_date.strftime(date_format)
+
+class TestFileOrder(unittest.TestCase):
+    def test(self):
+        files = [ListedFile() for _ in range(200)]
+        order = FileOrder()
+        order.add(files)
+        self.assertEqual([order.file(row) for row in range(len(order))], files)
+
+        tests = [
+            ('Date', lambda file: file.creation_date),
+            ('Scanner', lambda file: file.model),
+            ('Start', lambda file: file.start_frequency),
+            ('TV', lambda file: (file.start_tv_channel or 0, file.stop_tv_channel or 0)),
+            ('File', lambda file: file.filename)]
+        for column, key in tests:
+            order.sort(column)
+
+            # Adding and removing files gives the same order as sorting from scratch
+            new_files = [ListedFile() for _ in range(3)]
+            order.add(new_files[:1])
+            order.add(new_files[1:])
+            removed = files.pop(random.randrange(len(files)))
+            order.remove(removed)
+            files += new_files
+
+            # Files with changed details move to their new rows, ignoring files not listed
+            changed = random.choice(files)
+            changed.filename = f'Changed {changed.number:04}.csv'
+            changed.creation_date += datetime.timedelta(days=50)
+            changed.model = 'Changed'
+            changed.start_frequency += 50
+            changed.start_tv_channel, changed.stop_tv_channel = 60, 70
+            order.update([changed, removed])
+            expected = sorted(files, key=lambda file, key=key: (key(file), file.number))
+            self.assertEqual([order.file(row) for row in range(len(order))], expected, column)
+            self.assertEqual([order.row(file) for file in expected], list(range(len(expected))))
+            self.assertIsNone(order.row(removed))
+
+            # Sorting the same column again reverses the order, with ties still in the order added
+            order.sort(column)
+            self.assertTrue(order.reverse)
+            expected = sorted(files, key=lambda file, key=key: (key(file), -file.number), reverse=True)
+            self.assertEqual([order.file(row) for row in range(len(order))], expected, column)
+            self.assertEqual([order.row(file) for file in expected], list(range(len(expected))))
+
+        # Cells show file details
+        file = files[0]
+        file.start_tv_channel, file.stop_tv_channel = 21, 31
+        cells = [cell(file, '%d/%m/%Y') for _, _, cell in COLUMNS.values()]
+        self.assertEqual(cells[0], file.filename)
+        self.assertEqual(cells[1], file.creation_date.strftime('%d/%m/%Y'))
+        self.assertEqual(cells[3:], [f'{file.start_frequency:.3f}', f'{file.stop_frequency:.3f}', '21-31'])
+
+        order.clear()
+        self.assertEqual(len(order), 0)
+        self.assertIsNone(order.row(file))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,37 @@
 import unittest
 import os
+import re
+import datetime
 import pathlib
+import tempfile
+import tracemalloc
 
-from file import File
+import numpy
+
+import file as file_module
+from file import File, parse_csv, parse_csv_file
+from formats import format_wsm
 
 data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
 
+def write_shure_scan(filename, num_points):
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                   '<scan_data_source model="ULXD4Q" band="L51">\n'
+                   '    <data_sets count="1">\n        <freq_set>\n')
+        file.writelines(f'            <f>{470000 + i * 25}</f>\n' for i in range(num_points))
+        file.write('        </freq_set>\n'
+                   f'        <data_set start_freq="470000.0" stop_freq="{470000 + (num_points - 1) * 25}.0" '
+                   'date_time="1478923103117">\n')
+        file.writelines(f'            <v>-{90 + i % 20}.0</v>\n' for i in range(num_points))
+        file.write('        </data_set>\n    </data_sets>\n</scan_data_source>\n')
+
+def write_csv_scan(filename, num_points):
+    with open(filename, 'w', encoding='utf-8') as file:
+        file.write('Model Type: PSA2702,\nStart Frequency: 0470.0000 MHz,\n')
+        file.writelines(f'{470 + i * 0.0125:09.4f},-{90 + i % 17:05.1f}\n' for i in range(num_points))
+        file.write('\n')
+
 class TestFileParse(unittest.TestCase):
     def test(self):
         tests = [{
@@ -125,3 +151,272 @@ class TestFileParse(unittest.TestCase):
                 fut.in_out,
                 test['expected_in_out'],
                 f'Expected {test["filename"]} in_out to equal {test["expected_in_out"]}, got {fut.in_out}')
+
+class TestFileStorage(unittest.TestCase):
+    def test(self):
+        for dtype in [numpy.float64, numpy.float32]:
+            fut = File(os.path.join(data_directory, 'IN_001.csv'), 'United Kingdom', dtype=dtype)
+
+            self.assertEqual(fut.freqs.dtype, dtype)
+            self.assertEqual(fut.levels.dtype, dtype)
+            self.assertEqual(len(fut.frequencies), fut.data_points)
+            self.assertFalse(fut.freqs.flags.writeable)
+            self.assertAlmostEqual(fut.frequencies[0][0], 54.0, 3)
+            self.assertAlmostEqual(fut.frequencies[-1][1], -98.5, 3)
+            self.assertEqual(len(list(fut.frequencies)), fut.data_points)
+
+class TestFileCompact(unittest.TestCase):
+    def test(self):
+        for filename in os.listdir(data_directory):
+            expected = File(os.path.join(data_directory, filename), 'United Kingdom')
+            fut = File(os.path.join(data_directory, filename), 'United Kingdom', compact=True)
+            if not expected.valid:
+                continue
+
+            self.assertEqual(fut.get_output_file(), expected.get_output_file(), f'{filename} does not round trip')
+            self.assertEqual(list(fut.freqs_hz), list(expected.freqs_hz))
+            self.assertEqual(fut.freqs_hz.dtype, numpy.int64)
+            self.assertEqual(fut.levels_fixed.dtype, numpy.int32)
+            self.assertEqual(fut.nbytes, fut.data_points * 6, f'Expected {filename} to use 6 bytes per point')
+
+    def test_fallback(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'IN_001.csv')
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write('470.0000,-85.1234\n470.0125,-86.0000\n')
+            fut = File(filename, 'United Kingdom', compact=True)
+            self.assertEqual(fut.nbytes, 2 * 4 + 2 * 4)
+            self.assertEqual(list(fut.levels), [-85.1234, -86.0])
+
+class TestFileSlice(unittest.TestCase):
+    def test(self):
+        filename = os.path.join(data_directory, 'Shure ULXD.sdb2')
+        for compact in [False, True]:
+            fut = File(filename, 'United Kingdom', compact=compact)
+            freqs_hz = fut.freqs_hz
+            for span in [(0, 0), (650000000, 0), (650000000, 670000000), (650000001, 669999999), (900000000, 0),
+                         (0, 400000000)]:
+                in_span = freqs_hz >= span[0]
+                if span[1] != 0:
+                    in_span &= freqs_hz <= span[1]
+                got_freqs, got_levels = fut.slice_hz(span)
+                self.assertEqual(list(got_freqs), list(freqs_hz[in_span]), f'Frequencies in {span} do not match')
+                self.assertEqual(list(got_levels), list(fut.levels_fixed[in_span]), f'Levels in {span} do not match')
+                self.assertFalse(got_freqs.flags.writeable)
+                if not compact:
+                    self.assertTrue(numpy.shares_memory(got_freqs, fut.freqs_hz) or len(got_freqs) == 0)
+
+# Function to parse CSV text line by line as scans were originally parsed
+def parse_csv_text(text):
+    freqs = []
+    levels = []
+    for line in text.splitlines():
+        split_line = re.split('[\t,;]', line)
+        try:
+            freq = float(split_line[0].strip())
+            value = float(split_line[1].strip())
+            freqs.append(freq)
+            levels.append(value)
+        except (ValueError, IndexError):
+            pass
+    return freqs, levels
+
+# Function to parse a WSM scan line by line and format it sorted by frequency, as scans were
+# originally parsed and written
+def parse_wsm_text(filename):
+    frequencies = []
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            split_line = re.split('[    ,; ]', line)
+            try:
+                freq = float(split_line[0]) / 1000
+                value = -99 - (float(split_line[2]) * 0.0065 * -69)
+                if freq > 1:
+                    frequencies.append([freq, value])
+            except (ValueError, IndexError):
+                pass
+    return ''.join(f'{freq:09.4f},{value:09.4f}\n' for freq, value in sorted(frequencies, key=lambda point: point[0]))
+
+class TestCsvParse(unittest.TestCase):
+    def test(self):
+        tests = []
+        for filename in os.listdir(data_directory):
+            if filename.endswith('.csv'):
+                with open(os.path.join(data_directory, filename), 'rb') as file:
+                    tests.append((filename, file.read()))
+        tests.append(('trailing columns', (
+            b'Frequency,Level,Note\r\n470.0,-80.5,Peak\r\n470.025;-81.0;;x\r\n'
+            b'470.05\t-79.5\tmarker 2\r\n470.075,-82,\r\n470.1,Noise,-83\r\n470.125,-84.5')))
+        for name, contents in tests:
+            freqs, levels = parse_csv(numpy.frombuffer(contents, dtype=numpy.uint8))
+            expected_freqs, expected_levels = parse_csv_text(contents.decode('utf-8'))
+
+            self.assertEqual(list(freqs), expected_freqs, f'Frequencies in {name} do not match')
+            self.assertEqual(list(levels), expected_levels, f'Levels in {name} do not match')
+        self.assertEqual(len(freqs), 5)
+
+class TestCsvFileParse(unittest.TestCase):
+    def setUp(self):
+        self.chunk_size = file_module.READ_CHUNK_SIZE
+        file_module.READ_CHUNK_SIZE = 1000
+
+    def tearDown(self):
+        file_module.READ_CHUNK_SIZE = self.chunk_size
+
+    def test(self):
+        for filename in os.listdir(data_directory):
+            if not filename.endswith('.csv'):
+                continue
+            full_filename = os.path.join(data_directory, filename)
+            expected_freqs, expected_levels = parse_csv(numpy.fromfile(full_filename, dtype=numpy.uint8))
+            chunks = list(parse_csv_file(full_filename))
+            self.assertGreater(len(chunks), 1)
+            self.assertEqual(list(numpy.concatenate([chunk[0] for chunk in chunks])), list(expected_freqs))
+            self.assertEqual(list(numpy.concatenate([chunk[1] for chunk in chunks])), list(expected_levels))
+
+    def test_wsm(self):
+        freqs = 470 + numpy.arange(2000) * 0.025
+        levels = -90 + (numpy.arange(2000) % 60) / 2
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'WSM.csv')
+            with open(filename, 'w', encoding='utf-8') as file:
+                file.write(format_wsm(freqs, levels, 'RF Library', datetime.date(2020, 1, 1), (470, 520)))
+                file.write('0.5;;10\n470000;broken\n')
+            fut = File(filename, 'United Kingdom')
+
+            self.assertEqual(fut.model, 'Sennheiser WSM')
+            self.assertEqual(fut.data_points, 2000)
+            self.assertEqual(list(fut.freqs), list((freqs * 1000).astype(numpy.int64) / 1000))
+            self.assertEqual(fut.get_output_file(), parse_wsm_text(filename))
+
+    def test_memory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'IN_LARGE.csv')
+            write_csv_scan(filename, 100000)
+            file_module.READ_CHUNK_SIZE = 65536
+
+            tracemalloc.start()
+            fut = File(filename, 'United Kingdom')
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            self.assertEqual(fut.data_points, 100000)
+            self.assertLess(
+                peak,
+                os.path.getsize(filename) * 2,
+                f'Expected peak memory below twice the file size, got {peak}')
+
+class TestShureStreaming(unittest.TestCase):
+    def test(self):
+        peaks = []
+        sizes = []
+        with tempfile.TemporaryDirectory() as directory:
+            for num_points in [20000, 80000]:
+                filename = os.path.join(directory, f'Shure {num_points}.sdb2')
+                write_shure_scan(filename, num_points)
+
+                tracemalloc.start()
+                fut = File(filename, 'United Kingdom')
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                sizes.append(os.path.getsize(filename))
+
+                self.assertEqual(fut.data_points, num_points)
+                self.assertEqual(fut.model, 'Shure ULXD4Q (L51)')
+
+        # Memory growth should be a fraction of file growth (a DOM is many times larger)
+        self.assertLess(
+            peaks[1] - peaks[0],
+            (sizes[1] - sizes[0]) / 2,
+            f'Expected peak memory growth below half the file size growth, got {peaks[1] - peaks[0]}')
+
+class TestFileLazy(unittest.TestCase):
+    def test(self):
+        attributes = ['valid', 'model', 'start_frequency', 'stop_frequency', 'creation_date', 'start_tv_channel',
+                      'stop_tv_channel', 'new_filename', 'in_out']
+        with tempfile.TemporaryDirectory() as directory:
+            csv_filename = os.path.join(directory, 'IN_LARGE.csv')
+            write_csv_scan(csv_filename, 5000)
+            shure_filename = os.path.join(directory, 'Shure Large.sdb2')
+            write_shure_scan(shure_filename, 5000)
+            filenames = [csv_filename, shure_filename] + [os.path.join(data_directory, filename) for filename in [
+                'IN_001.csv', 'IN_005.csv', 'RFExplorer_SingleSweepData_2016_05_28_16_57_56.csv', 'Shure ULXD.sdb2']]
+
+            for filename in filenames:
+                expected = File(filename, 'United Kingdom')
+                fut = File(filename, 'United Kingdom', lazy=True)
+                self.assertEqual(fut.loaded, os.path.getsize(filename) <= file_module.SNIFF_SIZE, filename)
+
+                # Details shown in the file list are known without loading
+                for attribute in attributes:
+                    self.assertEqual(
+                        getattr(fut, attribute),
+                        getattr(expected, attribute),
+                        f'Expected lazy {attribute} of {filename} to equal {getattr(expected, attribute)}')
+                self.assertEqual(fut.loaded, os.path.getsize(filename) <= file_module.SNIFF_SIZE, filename)
+
+                # Data is loaded when first needed
+                self.assertEqual(fut.data_points, expected.data_points)
+                self.assertTrue(fut.loaded)
+                self.assertEqual(fut.resolution, expected.resolution)
+                self.assertEqual(list(fut.freqs_hz), list(expected.freqs_hz))
+                self.assertEqual(list(fut.levels_fixed), list(expected.levels_fixed))
+
+    def test_sniff(self):
+        parse_csv_buffer = file_module.parse_csv
+        parsed_bytes = []
+
+        # Function to record the size of each buffer parsed
+        def parse_csv_recorded(buffer, *args):
+            parsed_bytes.append(len(buffer))
+            return parse_csv_buffer(buffer, *args)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'IN_LARGE.csv')
+            write_csv_scan(filename, 100000)
+            file_module.parse_csv = parse_csv_recorded
+            try:
+                fut = File(filename, 'United Kingdom', lazy=True)
+            finally:
+                file_module.parse_csv = parse_csv_buffer
+
+            # Only the first and last blocks of a large scan are read
+            self.assertFalse(fut.loaded)
+            self.assertLessEqual(sum(parsed_bytes), 2 * file_module.SNIFF_SIZE)
+            self.assertEqual(fut.stop_frequency, 1719.9875)
+
+    def test_invalid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'Shure Truncated.sdb2')
+            write_shure_scan(filename, 5000)
+            with open(filename, 'r+b') as file:
+                file.truncate(os.path.getsize(filename) * 3 // 4)
+
+            # Scan with complete headers fails when loaded
+            fut = File(filename, 'United Kingdom', lazy=True)
+            self.assertTrue(fut.valid)
+            self.assertFalse(fut.load())
+            self.assertFalse(fut.valid)
+            self.assertEqual(fut.data_points, 0)
+            self.assertEqual(len(fut.freqs_hz), 0)
+
+            # Scan that could not be parsed elsewhere
+            fut = File(filename, 'United Kingdom', lazy=True)
+            fut.load_from(None)
+            self.assertFalse(fut.valid)
+            self.assertEqual(len(fut.freqs_hz), 0)
+
+    def test_load_from(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'Shure Large.sdb2')
+            write_shure_scan(filename, 5000)
+            expected = File(filename, 'United Kingdom', compact=True)
+            fut = File(filename, 'United Kingdom', lazy=True)
+
+            # Data parsed elsewhere is used without parsing again
+            os.remove(filename)
+            fut.load_from(expected)
+            self.assertTrue(fut.valid)
+            self.assertEqual(fut.data_points, 5000)
+            self.assertEqual(list(fut.freqs_hz), list(expected.freqs_hz))
+            self.assertEqual(list(fut.levels_fixed), list(expected.levels_fixed))
@@ -0,0 +1,24 @@
+import unittest
+import os
+import pathlib
+import shutil
+import tempfile
+
+data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
+
+# Test case with malformed scans written to a temporary directory, one that fails to parse and one
+# with complete headers that only fails once its data is loaded
+class TruncatedScanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.truncated = os.path.join(self.directory, 'Truncated.sdb2')
+        self.truncated_levels = os.path.join(self.directory, 'Truncated Levels.sdb2')
+        with open(os.path.join(data_directory, 'Shure ULXD.sdb2'), 'rb') as source:
+            contents = source.read()
+        with open(self.truncated, 'wb') as file:
+            file.write(contents[:len(contents) // 2])
+        with open(self.truncated_levels, 'wb') as file:
+            file.write(contents[:len(contents) * 3 // 4])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
@@ -0,0 +1,81 @@
+import unittest
+import os
+import pathlib
+import time
+
+from ingest import Ingestion, directory_files
+from tests.helpers import TruncatedScanTestCase
+
+data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
+
+# Function to collect results until ingestion has finished
+def wait_for_results(ingestion, timeout=60):
+    results = []
+    end_time = time.monotonic() + timeout
+    while not ingestion.finished and time.monotonic() < end_time:
+        results += ingestion.results()
+        time.sleep(0.01)
+    return results
+
+class TestIngestion(TruncatedScanTestCase):
+    def test(self):
+        files = ['IN_001.csv', 'Notcsv.xls', 'IN_002.csv', 'Shure ULXD.sdb2', 'Missing.csv']
+        for workers, repeat in [(1, 1), (2, 3)]:
+            filenames = ([self.truncated] + [os.path.join(data_directory, file) for file in files]) * repeat
+            ingestion = Ingestion(filenames, 'United Kingdom', workers=workers)
+            self.assertEqual(ingestion.total, len(filenames))
+            ingestion.start()
+            results = wait_for_results(ingestion)
+
+            # Results arrive in order, with unreadable files invalid
+            self.assertTrue(ingestion.finished)
+            self.assertEqual(ingestion.completed, len(filenames))
+            self.assertEqual([filename for filename, _ in results], filenames)
+            self.assertEqual(
+                [file is not None and file.valid for _, file in results],
+                [False, True, False, True, True, False] * repeat)
+
+    def test_lazy(self):
+        files = ['IN_001.csv', 'Notcsv.xls', 'RFExplorer_SingleSweepData_2016_05_28_16_57_56.csv', 'Shure ULXD.sdb2',
+                 'Missing.csv']
+        for workers, repeat in [(1, 1), (2, 3)]:
+            filenames = ([self.truncated, self.truncated_levels]
+                         + [os.path.join(data_directory, file) for file in files]) * repeat
+            ingestion = Ingestion(filenames, 'United Kingdom', workers=workers, lazy=True)
+            ingestion.start()
+            results = wait_for_results(ingestion)
+
+            # All files arrive in order, then sniffed files arrive again once loaded unless they were
+            # loaded before being returned
+            self.assertTrue(ingestion.finished)
+            self.assertEqual(ingestion.completed, len(filenames))
+            self.assertEqual([filename for filename, _ in results[:len(filenames)]], filenames)
+            for filename, file in results[len(filenames):]:
+                self.assertIn(file, [sniffed for _, sniffed in results[:len(filenames)]])
+                self.assertTrue(file.loaded, filename)
+
+            # Scans with complete headers that fail to load are invalid
+            self.assertEqual(
+                [file is not None and file.loaded and file.valid for _, file in results[:len(filenames)]],
+                [False, False, True, False, True, True, False] * repeat)
+
+    def test_cancel(self):
+        filenames = [os.path.join(data_directory, 'IN_001.csv')] * 50
+        ingestion = Ingestion(filenames, 'United Kingdom', workers=1)
+        ingestion.cancel()
+        ingestion.start()
+        self.assertEqual(wait_for_results(ingestion), [])
+        self.assertTrue(ingestion.cancelled)
+        self.assertTrue(ingestion.finished)
+
+    def test_directory_files(self):
+        os.mkdir(os.path.join(self.directory, 'Subdirectory'))
+        for filename in ['.hidden.csv', 'Truncated.sdb2.rfl', 'Orphan.rfl']:
+            with open(os.path.join(self.directory, filename), 'w', encoding='utf-8'):
+                pass
+        self.assertEqual(sorted(directory_files(self.directory)),
+                         [os.path.join(self.directory, filename)
+                          for filename in ['Orphan.rfl', 'Truncated Levels.sdb2', 'Truncated.sdb2']])
+
+if __name__ == '__main__':
+    unittest.main()
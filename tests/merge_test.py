@@ -0,0 +1,169 @@
+import unittest
+import random
+
+import numpy
+
+import merge
+from merge import merge_runs, resample_runs, span_indexes, MasterSpectrum
+from units import to_hz, to_fixed
+
+class TestMergeRuns(unittest.TestCase):
+    def test(self):
+        runs = []
+        points = []
+        for _ in range(20):
+            start = random.randint(0, 400)
+            freqs = sorted(start + step * 0.5 for step in range(random.randint(0, 200)))
+            levels = [float(random.randint(-110, -30)) for _ in freqs]
+            runs.append((numpy.array(freqs), numpy.array(levels)))
+            points += [[freq, level] for freq, level in zip(freqs, levels)]
+
+        # Sort then remove duplicates keeping the last (highest level) point
+        points = sorted(points)
+        expected = [point for i, point in enumerate(points) if i == len(points) - 1 or point[0] != points[i + 1][0]]
+
+        freqs, levels = merge_runs(runs)
+        self.assertEqual(list(freqs), [point[0] for point in expected])
+        self.assertEqual(list(levels), [point[1] for point in expected])
+
+    def test_integer_keys(self):
+        # Frequencies which differ in the last bit as floats are the same integer Hz
+        freqs_hz, levels_fixed = merge_runs([
+            (to_hz([470.125, 470.15]), to_fixed([-80.0, -70.0])),
+            (to_hz([470125 / 1000 + 1e-13, 470.175]), to_fixed([-60.0, -90.0]))])
+        self.assertEqual(list(freqs_hz), [470125000, 470150000, 470175000])
+        self.assertEqual(list(levels_fixed), [-60000000, -70000000, -90000000])
+
+    def test_empty(self):
+        freqs, levels = merge_runs([(numpy.empty(0), numpy.empty(0))])
+        self.assertEqual(len(freqs), 0)
+        self.assertEqual(len(levels), 0)
+
+# In-memory source with the File interface used by MasterSpectrum
+class Source:
+    def __init__(self, freqs, levels):
+        self.freqs = freqs
+        self.levels = levels
+        self.freqs_hz = to_hz(freqs)
+        self.levels_fixed = to_fixed(levels)
+        self.start_frequency = freqs[0] if len(freqs) > 0 else 0
+        self.stop_frequency = freqs[-1] if len(freqs) > 0 else 0
+        self.reads = 0
+
+    def slice_hz(self, span):
+        self.reads += 1
+        start, stop = span_indexes(self.freqs_hz, span)
+        return self.freqs_hz[start:stop], self.levels_fixed[start:stop]
+
+# Function to create a random source with sorted freqs and levels arrays
+def random_source():
+    start = random.randint(0, 400)
+    freqs = numpy.array(sorted(start + step * 0.5 for step in range(random.randint(0, 200))))
+    levels = numpy.array([float(random.randint(-110, -30)) for _ in freqs])
+    return Source(freqs, levels)
+
+class TestMasterSpectrum(unittest.TestCase):
+    def _expected(self, sources, limits):
+        runs = []
+        for source in sources:
+            in_limits = source.freqs >= limits[0]
+            if limits[1] != 0:
+                in_limits &= source.freqs <= limits[1]
+            runs.append((source.freqs[in_limits], source.levels[in_limits]))
+        return merge_runs(runs)
+
+    def test(self):
+        for limits in [(0, 0), (100, 0), (150, 350)]:
+            master = MasterSpectrum(limits)
+            sources = []
+            for _ in range(60):
+                if len(sources) > 0 and random.random() < 0.4:
+                    source = sources.pop(random.randrange(len(sources)))
+                    master.remove(source)
+                else:
+                    source = random_source()
+                    sources.append(source)
+                    master.add(source)
+                if random.random() < 0.5:
+                    freqs, levels = master.spectrum
+                    expected = self._expected(sources, limits)
+                    self.assertEqual(list(freqs), list(expected[0]))
+                    self.assertEqual(list(levels), list(expected[1]))
+                    self.assertEqual(len(master), len(expected[0]))
+
+    def test_set_limits(self):
+        master = MasterSpectrum()
+        sources = [random_source() for _ in range(10)]
+        for source in sources:
+            master.add(source)
+        for limits in [(0, 0), (200, 300), (0, 0)]:
+            master.set_limits(limits)
+            self.assertEqual(list(master.freqs), list(self._expected(sources, limits)[0]))
+
+    def test_skip_outside_limits(self):
+        sources = [Source(numpy.arange(0, 100) * 0.5 + start, numpy.full(100, -80.0)) for start in [100, 300, 500]]
+        master = MasterSpectrum((320, 330))
+        for source in sources:
+            master.add(source)
+        self.assertEqual(list(master.freqs), list(numpy.arange(0, 21) * 0.5 + 320))
+        self.assertEqual([source.reads for source in sources], [0, 1, 0])
+
+    def test_clear(self):
+        master = MasterSpectrum()
+        master.add(random_source())
+        self.assertEqual(len(master.freqs), len(master.levels))
+        master.clear()
+        self.assertEqual(len(master), 0)
+
+class TestResampleRuns(unittest.TestCase):
+    def setUp(self):
+        self.runs = [
+            (numpy.arange(0, 401) * 0.025 + 470, numpy.full(401, -80.0)),
+            (numpy.arange(0, 151) * 0.1 + 475, numpy.full(151, -60.0)),
+            (numpy.arange(0, 101) * 0.05 + 476, numpy.full(101, -70.0))]
+
+    def test_modes(self):
+        # 477MHz is covered by all three scans
+        for mode, percentile, expected in [
+                ('max', 50, -60),
+                ('min', 50, -80),
+                ('mean', 50, -70),
+                ('percentile', 50, -70),
+                ('percentile', 100, -60)]:
+            freqs, levels = resample_runs(self.runs, mode, 0, percentile)
+            self.assertEqual(len(freqs), 801)
+            self.assertAlmostEqual(freqs[1] - freqs[0], 0.025)
+            self.assertAlmostEqual(levels[numpy.argmin(abs(freqs - 477))], expected)
+            self.assertFalse(numpy.isnan(levels).any())
+
+    def test_resolution(self):
+        freqs, levels = resample_runs(self.runs, 'max', 0.5)
+        self.assertEqual(list(numpy.round(freqs, 4)), [470 + i * 0.5 for i in range(41)])
+        self.assertEqual(list(levels[:10]), [-80.0] * 10)
+
+    def test_gaps(self):
+        freqs = numpy.concatenate((numpy.arange(0, 11) * 0.1 + 470, numpy.arange(0, 11) * 0.1 + 480))
+        resampled, _ = resample_runs([(freqs, numpy.zeros(len(freqs)))], 'max', 0.05)
+        self.assertEqual(len(resampled), 42)
+        self.assertFalse(numpy.any((resampled > 471.0001) & (resampled < 479.9999)))
+
+    def test_empty(self):
+        for runs in [[], [(numpy.empty(0), numpy.empty(0))]]:
+            for resolution in [0, 0.5]:
+                freqs, levels = resample_runs(runs, 'max', resolution)
+                self.assertEqual((len(freqs), len(levels)), (0, 0))
+
+    def test_chunks(self):
+        expected = resample_runs(self.runs, 'mean')
+        chunk_values = merge.RESAMPLE_CHUNK_VALUES
+        merge.RESAMPLE_CHUNK_VALUES = 100
+        try:
+            result = resample_runs(self.runs, 'mean')
+        finally:
+            merge.RESAMPLE_CHUNK_VALUES = chunk_values
+        self.assertTrue(numpy.array_equal(result[0], expected[0]))
+        self.assertTrue(numpy.array_equal(result[1], expected[1]))
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            resample_runs(self.runs, 'median')
@@ -5,6 +5,9 @@ import pathlib
 import settings
 import data
 from output import Output
+from file import File
+from merge import MasterSpectrum
+from tests.helpers import TruncatedScanTestCase
 
 data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
 
@@ -67,3 +70,89 @@ class TestOutput(unittest.TestCase):
                 test['expected_output_lines'],
                 (f'Expected number of lines in output to equal {test["expected_output_lines"]}, '
                  f'got {num_lines}'))
+
+            # Decimated export keeps the strongest carrier
+            freqs, levels = output.merge()
+            output.export_max_points = 100
+            decimated_freqs, decimated_levels = output.merge()
+            self.assertLessEqual(len(decimated_freqs), 100)
+            self.assertEqual(decimated_levels.max(), levels.max())
+            self.assertIn(freqs[levels.argmax()], decimated_freqs)
+
+class TestOutputBatch(TruncatedScanTestCase):
+    def test(self):
+        files = ['IN_001.csv', 'IN_002.csv', 'Notcsv.xls', 'IN_003.csv', 'IN_004.csv', 'IN_005.csv',
+                 'RFExplorer_SingleSweepData_2016_05_28_16_57_56.csv', 'Shure ULXD.sdb2', 'IN_001.csv']
+        for workers in [1, 2]:
+            output = Output(
+                venue='Hammersmith Apollo',
+                town='London',
+                country='United Kingdom',
+                file_structure=settings.DEFAULT_FILENAME_STRUCTURE,
+                default_library_location=data.default_library_location,
+                dir_structure=settings.DEFAULT_DIRECTORY_STRUCTURE,
+                date_format=settings.DEFAULT_DATE_FORMAT,
+                forename='John',
+                surname='Smith',
+                copy_source_files=True,
+                delete_source_files=True,
+                low_freq_limit=0,
+                high_freq_limit=0)
+            invalid_files = output.add_files(
+                [self.truncated] + [os.path.join(data_directory, file) for file in files],
+                'United Kingdom',
+                workers)
+
+            self.assertEqual(invalid_files, [self.truncated, os.path.join(data_directory, 'Notcsv.xls')])
+            self.assertEqual(
+                [file.filename for file in output.files],
+                [file for file in files if file != 'Notcsv.xls'])
+            self.assertEqual(output.files[-1].data_points, 271)
+            self.assertEqual(output.io_guess, 7)
+
+    def test_lazy(self):
+        output = Output(
+            venue='Hammersmith Apollo',
+            town='London',
+            country='United Kingdom',
+            file_structure=settings.DEFAULT_FILENAME_STRUCTURE,
+            default_library_location=data.default_library_location,
+            dir_structure=settings.DEFAULT_DIRECTORY_STRUCTURE,
+            date_format=settings.DEFAULT_DATE_FORMAT,
+            forename='John',
+            surname='Smith',
+            copy_source_files=True,
+            delete_source_files=True,
+            low_freq_limit=0,
+            high_freq_limit=0)
+        files = [File(filename, 'United Kingdom', lazy=True) for filename in [
+            os.path.join(data_directory, 'IN_001.csv'),
+            self.truncated_levels,
+            os.path.join(data_directory, 'IN_002.csv'),
+            os.path.join(data_directory, 'Shure ULXD.sdb2')]]
+        self.assertEqual(output.add_files(files, 'United Kingdom'), [])
+
+        # Sniffed files are listed but not merged until loaded
+        self.assertEqual(output.files, files)
+        self.assertEqual(len(output.master), 0)
+        self.assertTrue(all(output.is_loading(file) for file in files))
+        self.assertFalse(any(file.loaded for file in files))
+
+        # Loading merges valid files and removes invalid files, without adding removed files again
+        output.remove_file(files[2])
+        self.assertEqual(output.load_files(files), [files[1]])
+        self.assertEqual(output.files, [files[0], files[3]])
+        self.assertFalse(any(output.is_loading(file) for file in files))
+        self.assertEqual(output.io_guess, 1)
+        expected = MasterSpectrum()
+        for filename in ['IN_001.csv', 'Shure ULXD.sdb2']:
+            expected.add(File(os.path.join(data_directory, filename), 'United Kingdom'))
+        self.assertEqual(list(output.master.freqs_hz), list(expected.freqs_hz))
+
+        # Files still waiting to be loaded are removed when adding files is cancelled
+        waiting = File(os.path.join(data_directory, 'IN_003.csv'), 'United Kingdom', lazy=True)
+        output.add_files([waiting], 'United Kingdom')
+        self.assertEqual(output.remove_loading_files(), [waiting])
+        self.assertEqual(output.files, [files[0], files[3]])
+        self.assertEqual(output.io_guess, 1)
+        self.assertFalse(waiting.loaded)
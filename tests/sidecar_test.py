@@ -0,0 +1,79 @@
+import unittest
+import os
+import pathlib
+import shutil
+import tempfile
+
+import numpy
+
+from file import File
+from sidecar import write_sidecar, read_sidecar, sidecar_filename, InvalidSidecarError
+from writer import Writer
+
+data_directory = os.path.join(pathlib.Path(__file__).parent.resolve(), 'data')
+
+class TestSidecar(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test(self):
+        for num_points in [0, 1, 1001]:
+            filename = os.path.join(self.directory, f'scan{num_points}.rfl')
+            freqs_hz = 470000000 + numpy.arange(num_points, dtype=numpy.int64) * 25000
+            levels_fixed = -numpy.arange(num_points, dtype=numpy.int32) * 5
+            metadata = {'model': 'TTi PSA2702', 'venue': 'Venue', 'tv_channels': [21, 37]}
+            write_sidecar(filename, freqs_hz, levels_fixed, metadata)
+
+            got_freqs, got_levels, got_metadata = read_sidecar(filename)
+            self.assertEqual(list(got_freqs), list(freqs_hz))
+            self.assertEqual(list(got_levels), list(levels_fixed))
+            self.assertEqual(got_metadata, metadata)
+            self.assertFalse(got_freqs.flags.writeable)
+            if num_points > 0:
+                self.assertIsInstance(got_freqs, numpy.memmap)
+
+    def test_invalid(self):
+        for contents in [b'', b'not a sidecar file at all', b'RFLIBRY\0\x01\0\0\0\xff\xff\0\0\0\0\0\0\0\0\0\0']:
+            filename = os.path.join(self.directory, 'invalid.rfl')
+            with open(filename, 'wb') as file:
+                file.write(contents)
+            with self.assertRaises(InvalidSidecarError):
+                read_sidecar(filename)
+            self.assertFalse(File(filename, 'United Kingdom').valid)
+
+    def test_file(self):
+        source = os.path.join(self.directory, 'IN_001.csv')
+        shutil.copyfile(os.path.join(data_directory, 'IN_001.csv'), source)
+        expected = File(source, 'United Kingdom')
+        self.assertTrue(Writer().write_sidecar_file(
+            sidecar_filename(source),
+            (expected.freqs_hz, expected.levels_fixed),
+            {'model': expected.model, 'creation_date': expected.creation_date.timestamp()}))
+
+        # Sidecar opened directly and in place of the older CSV
+        for filename in [sidecar_filename(source), source]:
+            fut = File(filename, 'United Kingdom')
+            self.assertTrue(fut.valid)
+            self.assertEqual(fut.get_output_file(), expected.get_output_file())
+            self.assertEqual(fut.model, expected.model)
+            self.assertEqual(fut.data_points, expected.data_points)
+            self.assertEqual(fut.start_tv_channel, expected.start_tv_channel)
+
+        # A scan with the same name in another format does not use the sidecar
+        other = os.path.join(self.directory, 'IN_001.sdb2')
+        shutil.copyfile(os.path.join(data_directory, 'Shure ULXD.sdb2'), other)
+        os.utime(sidecar_filename(source))
+        self.assertEqual(sidecar_filename(source), f'{source}.rfl')
+        self.assertEqual(File(other, 'United Kingdom').model, 'Shure ULXD4Q (L51)')
+
+        # A CSV newer than its sidecar is parsed
+        with open(source, 'a', encoding='utf-8') as file:
+            file.write('0088.1260,-050.0\n')
+        os.utime(sidecar_filename(source), (0, 0))
+        self.assertEqual(File(source, 'United Kingdom').data_points, expected.data_points + 1)
+
+if __name__ == '__main__':
+    unittest.main()
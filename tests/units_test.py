@@ -0,0 +1,30 @@
+import unittest
+
+import numpy
+
+from units import to_hz, from_hz, to_fixed, from_fixed
+
+class TestUnits(unittest.TestCase):
+    def test(self):
+        for freq, level in [(470.125, -85.5), (54.0, -98.5), (2400.0001, -10.1234), (0.0, 0.0)]:
+            freqs_hz = to_hz([freq])
+            levels_fixed = to_fixed([level])
+            self.assertEqual(freqs_hz.dtype, numpy.int64)
+            self.assertEqual(levels_fixed.dtype, numpy.int32)
+            self.assertEqual(from_hz(freqs_hz)[0], freq)
+            self.assertEqual(from_fixed(levels_fixed)[0], level)
+
+    def test_rounding(self):
+        self.assertEqual(list(to_hz([470.1249999999, 470.125, 470125 / 1000])), [470125000] * 3)
+        self.assertEqual(list(to_fixed([-85.1234564, -85.12345651])), [-85123456, -85123457])
+        self.assertEqual(from_hz(to_hz([470.125]), numpy.float32).dtype, numpy.float32)
+
+    def test_format(self):
+        # Levels computed from WSM scans are often halfway between 4 decimals once stored
+        levels = -99 - numpy.arange(0, 1000, 0.1) * 0.0065 * -69
+        self.assertEqual(
+            [f'{level:09.4f}' for level in from_fixed(to_fixed(levels))],
+            [f'{level:09.4f}' for level in levels.tolist()])
+
+if __name__ == '__main__':
+    unittest.main()
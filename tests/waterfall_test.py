@@ -0,0 +1,78 @@
+import unittest
+import datetime
+
+import numpy
+
+from merge import span_indexes
+from units import to_hz, to_fixed
+from waterfall import Waterfall
+
+class Source:
+    def __init__(self, freqs, levels, day):
+        self.freqs_hz = to_hz(freqs)
+        self.levels_fixed = to_fixed(levels)
+        self.start_frequency = freqs[0]
+        self.stop_frequency = freqs[-1]
+        self.creation_date = datetime.datetime(2023, 8, day)
+        self.reads = 0
+
+    def slice_hz(self, span):
+        self.reads += 1
+        start, stop = span_indexes(self.freqs_hz, span)
+        return self.freqs_hz[start:stop], self.levels_fixed[start:stop]
+
+class TestWaterfall(unittest.TestCase):
+    def setUp(self):
+        freqs = 470 + numpy.arange(1000) * 0.01
+        self.newer = Source(freqs, numpy.full(len(freqs), -100.0), 2)
+        self.newer.levels_fixed = to_fixed(numpy.where(numpy.arange(1000) == 500, -30.0, -100.0))
+        self.older = Source(freqs[:500], numpy.full(500, -90.0), 1)
+
+    def test(self):
+        waterfall = Waterfall(columns=10)
+        self.assertEqual(waterfall.grid.shape, (0, 10))
+        self.assertIsNone(waterfall.span)
+
+        waterfall.add(self.newer)
+        waterfall.add(self.older)
+        self.assertEqual(len(waterfall), 2)
+        self.assertEqual(waterfall.span, (470, 479.99))
+
+        # Rows ordered oldest first, each column keeping its highest level
+        grid = waterfall.grid
+        self.assertEqual(grid.shape, (2, 10))
+        self.assertTrue(numpy.all(grid[0, :5] == -90))
+        self.assertTrue(numpy.all(numpy.isnan(grid[0, 5:])))
+        self.assertEqual(list(grid[1]), [-100] * 5 + [-30] + [-100] * 4)
+
+        # Only new sources are read while the span is unchanged
+        third = Source(470 + numpy.arange(100) * 0.05, numpy.full(100, -80.0), 3)
+        waterfall.add(third)
+        self.assertEqual(waterfall.grid.shape, (3, 10))
+        self.assertEqual((self.newer.reads, self.older.reads, third.reads), (1, 1, 1))
+
+        # Removing the widest source narrows the span
+        waterfall.remove(self.newer)
+        self.assertEqual(len(waterfall), 2)
+        self.assertEqual(waterfall.span, (470, 474.99))
+        self.assertTrue(numpy.all(waterfall.grid == [[-90] * 10, [-80] * 10]))
+
+    def test_limits(self):
+        waterfall = Waterfall((475, 0), columns=5)
+        waterfall.add(self.newer)
+        waterfall.add(self.older)
+        self.assertEqual(waterfall.span, (475, 479.99))
+        self.assertTrue(numpy.all(waterfall.grid[1] == [-30, -100, -100, -100, -100]))
+
+        # Changing limits recomputes every row, older source was outside the first limits so never read
+        waterfall.set_limits((470, 475))
+        self.assertEqual(waterfall.span, (470, 475))
+        self.assertEqual(waterfall.grid.shape, (2, 5))
+        self.assertEqual((self.newer.reads, self.older.reads), (2, 1))
+
+        waterfall.clear()
+        self.assertEqual(len(waterfall), 0)
+        self.assertEqual(waterfall.grid.shape, (0, 5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import shutil
+import datetime
+import tempfile
+import unittest
+import numpy
+from writer import Writer
+from formats import format_csv, format_wsm, CHUNK_SIZE
+import data
+
+class TestWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = Writer()
+        self.directory = tempfile.mkdtemp()
+        freqs = numpy.linspace(470, 790, CHUNK_SIZE * 2 + 17)
+        levels = numpy.linspace(-110, -20, len(freqs))
+        self.spectrum = (freqs, levels)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _read(self, filename):
+        with open(filename, 'r', encoding='UTF-8') as file:
+            return file.read()
+
+    def test_write_chunks(self):
+        for (contents, expected) in [
+            ('a,b\n', 'a,b\n'),
+            (iter(['a,', 'b\n', 'c,d\n']), 'a,b\nc,d\n'),
+            ([], '')]:
+            filename = os.path.join(self.directory, 'test.csv')
+            self.assertTrue(self.writer.write_file(filename, contents))
+            self.assertEqual(self._read(filename), expected)
+
+    def test_write_csv_file(self):
+        filename = os.path.join(self.directory, 'master.csv')
+        self.assertTrue(self.writer.write_csv_file(filename, self.spectrum))
+        self.assertEqual(self._read(filename), format_csv(*self.spectrum))
+
+    def test_write_wsm_file(self):
+        filename = os.path.join(self.directory, 'master-WSM.csv')
+        date = datetime.date(2020, 5, 17)
+        self.assertTrue(self.writer.write_wsm_file(filename, self.spectrum, date, (470, 790)))
+        self.assertEqual(self._read(filename), format_wsm(*self.spectrum, data.TITLE, date, (470, 790)))
+
+    def test_write_failure(self):
+        filename = os.path.join(self.directory, 'missing', 'master.csv')
+        self.assertFalse(self.writer.write_csv_file(filename, self.spectrum))
+
+if __name__ == '__main__':
+    unittest.main()